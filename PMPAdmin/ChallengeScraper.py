@@ -7,6 +7,10 @@ from urllib.parse import urlparse
 from collections import defaultdict
 from typing import Dict, List, Tuple, DefaultDict, Optional
 
+from .MemberResolver import get_member_resolver
+from .MessageRouter import get_message_router
+from .RestScheduler import Priority, get_rest_scheduler
+
 """ChallengeScraper Cog
 ========================
 Scrapes Discord **Forum Channels** that host daily challenge threads titled like
@@ -123,6 +127,21 @@ class ChallengeScraper(commands.Cog):
             thread_message_map={},      # {day_thread_id: summary_message_id}
         )
         self._locks: Dict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self.members = get_member_resolver(bot)
+        self.router = get_message_router(bot)
+        self.rest = get_rest_scheduler(bot)
+        # {guild_id: forum_channel_id}, mirrored from config for the listeners
+        self._forum_ids: Dict[int, int] = {}
+
+    async def cog_load(self):
+        for gid, data in (await self.config.all_guilds()).items():
+            if data.get("forum_channel_id"):
+                self._forum_ids[gid] = data["forum_channel_id"]
+                self.router.set_channels("ChallengeScraper", gid, [data["forum_channel_id"]])
+        self.router.register("ChallengeScraper", on_message=self._on_day_message)
+
+    def cog_unload(self):
+        self.router.unregister("ChallengeScraper")
 
     # -----------------------------------------------------
     # Helper – forum / summary thread resolution
@@ -141,14 +160,16 @@ class ChallengeScraper(commands.Cog):
                 return t
 
         # Create summary thread – discord.py ≥2.4 returns (Thread, Message)
-        created = await forum.create_thread(
+        created = await self.rest.run(
+            Priority.NOTICES,
+            forum.create_thread,
             name="Challenge Summary",
             content="Initialising summary …",
         )
         thread = created[0] if isinstance(created, tuple) else created  # type: ignore
         # Lock so only bot can post
         try:
-            await thread.edit(locked=True)
+            await self.rest.run(Priority.NOTICES, thread.edit, locked=True)
         except Exception:
             pass
         await self.config.guild(forum.guild).summary_thread_id.set(thread.id)
@@ -171,16 +192,24 @@ class ChallengeScraper(commands.Cog):
         alphabetised by name and with duplicate links removed.
         """
         per_user: DefaultDict[int, list[str]] = defaultdict(list)
+        authors: Dict[int, discord.abc.User] = {}
 
         async for msg in thread.history(oldest_first=True, limit=None):
             links = self._extract_urls_from_message(msg)
             if links:
                 per_user[msg.author.id].extend(links)
+                authors[msg.author.id] = msg.author
+
+        # history() only yields a Member when the author is in the member cache;
+        # resolve the rest in one batch, falling back to the account name for
+        # people who have left the server.
+        unresolved = [uid for uid, author in authors.items() if not isinstance(author, discord.Member)]
+        members = await self.members.resolve_many(thread.guild, unresolved) if unresolved else {}
 
         records: list[tuple[str, list[str]]] = []
         for uid, urls in per_user.items():
-            member = thread.guild.get_member(uid)
-            name = member.display_name if member else f"User {uid}"
+            member = members.get(uid) or authors[uid]
+            name = member.display_name
             deduped = sorted(dict.fromkeys(urls))  # preserve deterministic order
             records.append((name, deduped))
 
@@ -245,7 +274,7 @@ class ChallengeScraper(commands.Cog):
         chunks = _split_chunks(content)
         first: Optional[discord.Message] = None
         for chunk in chunks:
-            msg = await thread.send(chunk)
+            msg = await self.rest.run(Priority.NOTICES, thread.send, chunk)
             first = first or msg
         return first
 
@@ -259,12 +288,12 @@ class ChallengeScraper(commands.Cog):
           fresh chunks via _split_and_send.
         """
         if len(content) <= DISCORD_LIMIT:
-            return await existing.edit(content=content)
+            return await self.rest.run(Priority.NOTICES, existing.edit, content=content)
 
         # ---- need to replace multi-part summary ----
         parent = existing.channel  # the summary thread
         after_id = existing.id
-        await existing.delete()
+        await self.rest.run(Priority.NOTICES, existing.delete)
 
         # Delete any subsequent bot messages that are part of the
         # same (now-stale) summary chunk chain.
@@ -279,7 +308,7 @@ class ChallengeScraper(commands.Cog):
             if msg.content.startswith("**DAY"):
                 break
             try:
-                await msg.delete()
+                await self.rest.run(Priority.NOTICES, msg.delete)
             except discord.HTTPException:
                 pass
 
@@ -338,7 +367,7 @@ class ChallengeScraper(commands.Cog):
         async for msg in summary_thread.history(limit=None, oldest_first=True):
             if msg.author == self.bot.user:
                 try:
-                    await msg.delete()
+                    await self.rest.run(Priority.BULK, msg.delete)
                     deleted += 1
                 except discord.HTTPException:
                     pass
@@ -411,23 +440,19 @@ class ChallengeScraper(commands.Cog):
         forum = thread.parent
         if not isinstance(forum, discord.ForumChannel):
             return
-        if await self.config.guild(forum.guild).forum_channel_id() != forum.id:
+        if self._forum_ids.get(forum.guild.id) != forum.id:
             return
         summary_thread = await self._ensure_summary_thread(forum)
         await self._update_summary_msg(summary_thread, thread)
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if message.author.bot or isinstance(message.channel, discord.DMChannel):
-            return
+    async def _on_day_message(self, message: discord.Message):
+        """Routed by MessageRouter for messages in the registered forum's threads."""
         thread = message.channel
         if not isinstance(thread, discord.Thread) or not DAY_PATTERN.match(thread.name):
             return
         forum = thread.parent
         if not isinstance(forum, discord.ForumChannel):
             return
-        if await self.config.guild(forum.guild).forum_channel_id() != forum.id:
-            return
         summary_id = await self.config.guild(forum.guild).summary_thread_id()
         if not summary_id:
             return
@@ -0,0 +1,311 @@
+"""Records the gateway events the PMPAdmin cogs react to, for offline replay.
+
+While a recording runs, messages, edits, reaction adds/removes, member joins
+and updates and thread creations are appended to a gzipped JSONL file under
+``data/PMPAdmin/recordings``. ``benchmarks/replay.py`` feeds such a file back
+through the real cog listeners.
+
+Recordings are anonymised: user IDs and names are replaced by a salted
+hash, message text keeps only its length and the shape of its links (host
+plus a hashed path, with YouTube IDs swapped for hashed 11-character IDs
+and every other query parameter dropped),
+and attachment names keep only their extension. Guild, channel, role and
+message IDs are kept so the cogs' configured channels and reaction-role
+messages still match on replay.
+
+The listeners are attached only while recording, so the cog costs nothing
+otherwise.
+"""
+import asyncio
+import gzip
+import hashlib
+import hmac
+import json
+import logging
+import os
+import re
+import secrets
+import threading
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import discord
+from redbot.core import commands
+
+from .MessageRouter import get_message_router
+
+log = logging.getLogger("red.pmpadmin.recorder")
+
+RECORDINGS_DIR = os.path.join("data", "PMPAdmin", "recordings")
+RECORDING_VERSION = 1
+FLUSH_SECONDS = 2
+DEFAULT_MINUTES = 30
+MAX_MINUTES = 24 * 60
+
+_URL = re.compile(r"https?://\S+")
+_WORD_CHAR = re.compile(r"\S")
+_VIDEO_ID = re.compile(r"[\w-]{11}")
+_DAY_NAME = re.compile(r"^day\s+\d+", re.I)
+# Path segments that describe the kind of link rather than who posted it;
+# kept so link classification behaves the same on replay.
+_KEEP_SEGMENTS = {"watch", "shorts", "embed", "track", "album", "playlist", "artist", "sets", "music", "song", "video"}
+
+EVENTS = (
+    "on_message",
+    "on_message_edit",
+    "on_raw_reaction_add",
+    "on_raw_reaction_remove",
+    "on_member_join",
+    "on_member_update",
+    "on_thread_create",
+)
+
+
+class _Anonymiser:
+    def __init__(self):
+        self._salt = secrets.token_bytes(16)
+
+    def _digest(self, value: str) -> "hmac.HMAC":
+        return hmac.new(self._salt, value.encode(), hashlib.sha256)
+
+    def user(self, user_id: int) -> int:
+        # 63-bit so it still fits where the cogs expect a snowflake
+        return int.from_bytes(self._digest(f"u{user_id}").digest()[:8], "big") >> 1
+
+    def token(self, value: str, length: int) -> str:
+        # hex keeps tokens alphanumeric, so they still match the ID patterns links are parsed with
+        return self._digest(value).hexdigest()[:length]
+
+    def content(self, text: str) -> str:
+        """Keep the length, whitespace and link structure of *text*, drop its words."""
+        parts: List[str] = []
+        last = 0
+        for m in _URL.finditer(text):
+            parts.append(_WORD_CHAR.sub("x", text[last:m.start()]))
+            parts.append(self.url(m.group()))
+            last = m.end()
+        parts.append(_WORD_CHAR.sub("x", text[last:]))
+        return "".join(parts)
+
+    def url(self, url: str) -> str:
+        """Keep scheme, host and link kind; hash the path and drop the query except a hashed ``v``.
+
+        Query strings carry sharer tokens (``si=``) and playlist IDs, so only
+        the video ID the cogs look at survives. An 11-character segment hashes
+        to the same value as the ``v`` parameter, so one video keeps one ID
+        across ``watch?v=``, ``youtu.be/`` and ``shorts/`` links.
+        """
+        parsed = urlparse(url)
+        segments = [
+            seg if seg.lower() in _KEEP_SEGMENTS or not seg else self.token(seg, max(4, min(len(seg), 22)))
+            for seg in parsed.path.split("/")
+        ]
+        ext = os.path.splitext(parsed.path)[1]
+        video = parse_qs(parsed.query).get("v", [""])[0]
+        query = f"?v={self.token(video, 11)}" if _VIDEO_ID.fullmatch(video) else ""
+        return f"{parsed.scheme}://{parsed.netloc}{'/'.join(segments)}{ext}{query}"
+
+
+class EventRecorder(commands.Cog):
+    """Owner-only gateway event recorder for load-testing replays."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._path: Optional[str] = None
+        self._anon: Optional[_Anonymiser] = None
+        self._started = 0.0
+        self._buffer: List[str] = []
+        self._count = 0
+        self._flusher: Optional[asyncio.Task] = None
+        self._stopper: Optional[asyncio.Task] = None
+        self._handlers = {event: getattr(self, f"_record_{event[3:]}") for event in EVENTS}
+
+    async def cog_unload(self):
+        await self._stop()
+
+    # ------------------------------------------------------------------
+    # Commands
+    # ------------------------------------------------------------------
+    @commands.group()
+    @commands.is_owner()
+    async def eventrecord(self, ctx: commands.Context):
+        """Record anonymised gateway events for offline replay."""
+        if ctx.invoked_subcommand is None:
+            await ctx.send_help()
+
+    @eventrecord.command(name="start")
+    async def _start_cmd(self, ctx: commands.Context, minutes: int = DEFAULT_MINUTES):
+        """Record for up to `minutes` (default 30)."""
+        if self._path:
+            return await ctx.send(f"Already recording to `{self._path}`.")
+        minutes = max(1, min(minutes, MAX_MINUTES))
+        await self._start()
+        self._stopper = asyncio.create_task(self._stop_after(minutes * 60))
+        await ctx.send(f"⏺️ Recording gateway events for {minutes} minute(s) to `{self._path}`.")
+
+    @eventrecord.command(name="stop")
+    async def _stop_cmd(self, ctx: commands.Context):
+        """Stop recording and report the file."""
+        if not self._path:
+            return await ctx.send("Not recording.")
+        path, count = self._path, self._count
+        await self._stop()
+        await ctx.send(f"⏹️ Recorded {count} event(s) to `{path}`.")
+
+    @eventrecord.command(name="status")
+    async def _status_cmd(self, ctx: commands.Context):
+        if not self._path:
+            return await ctx.send("Not recording.")
+        await ctx.send(f"Recording to `{self._path}`: {self._count} event(s) in {time.monotonic() - self._started:.0f}s.")
+
+    # ------------------------------------------------------------------
+    # Recording lifecycle
+    # ------------------------------------------------------------------
+    async def _start(self):
+        os.makedirs(RECORDINGS_DIR, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+        self._path = os.path.join(RECORDINGS_DIR, f"events-{stamp}.jsonl.gz")
+        self._anon = _Anonymiser()
+        self._started = time.monotonic()
+        self._count = 0
+        self._buffer = [json.dumps(self._header())]
+        for event, handler in self._handlers.items():
+            self.bot.add_listener(handler, event)
+        self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def _stop_after(self, seconds: float):
+        await asyncio.sleep(seconds)
+        await self._stop()
+
+    async def _stop(self):
+        if not self._path:
+            return
+        for event, handler in self._handlers.items():
+            self.bot.remove_listener(handler, event)
+        if self._flusher:
+            self._flusher.cancel()
+        if self._stopper and self._stopper is not asyncio.current_task():
+            self._stopper.cancel()
+        await self._flush()
+        log.info("Recorded %d gateway event(s) to %s", self._count, self._path)
+        self._path = self._anon = self._flusher = self._stopper = None
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(FLUSH_SECONDS)
+            await self._flush()
+
+    async def _flush(self):
+        if not self._buffer:
+            return
+        lines, self._buffer = self._buffer, []
+        await asyncio.to_thread(self._append, self._path, lines)
+
+    _write_lock = threading.Lock()
+
+    @classmethod
+    def _append(cls, path: str, lines: List[str]):
+        # a cancelled flush keeps writing in its thread; never interleave with the next one
+        with cls._write_lock:
+            # each flush adds a gzip member; readers see one continuous stream
+            with gzip.open(path, "at", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+
+    def _header(self) -> dict:
+        """What replay needs to configure the cogs: watched channels and reaction-role mappings."""
+        role_cog = self.bot.get_cog("RoleAssignment")
+        reaction_roles = {}
+        if role_cog is not None:
+            for gid, messages in role_cog.emoji_map.items():
+                tracked = role_cog.cache.get(gid, {})
+                reaction_roles[gid] = {mid: mapping for mid, mapping in messages.items() if mid in tracked}
+        return {
+            "type": "header",
+            "version": RECORDING_VERSION,
+            "started": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "routes": get_message_router(self.bot).snapshot(),
+            "reaction_roles": reaction_roles,
+        }
+
+    def _emit(self, record: dict):
+        record["t"] = round(time.monotonic() - self._started, 4)
+        self._buffer.append(json.dumps(record, separators=(",", ":"), ensure_ascii=False))
+        self._count += 1
+
+    # ------------------------------------------------------------------
+    # Event encoders
+    # ------------------------------------------------------------------
+    def _author(self, user) -> dict:
+        return {
+            "id": self._anon.user(user.id),
+            "bot": user.bot,
+            # cogs see a Member only when the author is in the member cache
+            "member": isinstance(user, discord.Member),
+        }
+
+    def _channel(self, channel) -> dict:
+        data = {"id": channel.id, "kind": type(channel).__name__}
+        if isinstance(channel, discord.Thread):
+            data["parent"] = channel.parent_id
+            data["name"] = channel.name if _DAY_NAME.match(channel.name) else "thread"
+        return data
+
+    def _message(self, message: discord.Message) -> dict:
+        return {
+            "id": message.id,
+            "guild": message.guild.id if message.guild else None,
+            "channel": self._channel(message.channel),
+            "author": self._author(message.author),
+            "content": self._anon.content(message.content),
+            "attachments": [
+                [os.path.splitext(a.filename)[1].lower(), a.content_type] for a in message.attachments
+            ],
+            "stickers": len(message.stickers),
+        }
+
+    def _member(self, member: discord.Member) -> dict:
+        return {
+            "id": self._anon.user(member.id),
+            "bot": member.bot,
+            "roles": [r.id for r in member.roles if not r.is_default()],
+            "joined_days": (discord.utils.utcnow() - member.joined_at).total_seconds() / 86400 if member.joined_at else 0,
+        }
+
+    async def _record_message(self, message: discord.Message):
+        self._emit({"type": "message", "message": self._message(message)})
+
+    async def _record_message_edit(self, before: discord.Message, after: discord.Message):
+        self._emit({"type": "message_edit", "message": self._message(after)})
+
+    async def _record_reaction(self, kind: str, payload: discord.RawReactionActionEvent):
+        self._emit({
+            "type": kind,
+            "guild": payload.guild_id,
+            "channel": payload.channel_id,
+            "message": payload.message_id,
+            "user": self._anon.user(payload.user_id),
+            "bot": payload.member.bot if payload.member else None,
+            "emoji": [payload.emoji.id, payload.emoji.name],
+        })
+
+    async def _record_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
+        await self._record_reaction("reaction_add", payload)
+
+    async def _record_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
+        await self._record_reaction("reaction_remove", payload)
+
+    async def _record_member_join(self, member: discord.Member):
+        self._emit({"type": "member_join", "guild": member.guild.id, "member": self._member(member)})
+
+    async def _record_member_update(self, before: discord.Member, after: discord.Member):
+        self._emit({
+            "type": "member_update",
+            "guild": after.guild.id,
+            "before": self._member(before),
+            "member": self._member(after),
+        })
+
+    async def _record_thread_create(self, thread: discord.Thread):
+        self._emit({"type": "thread_create", "guild": thread.guild.id, "channel": self._channel(thread)})
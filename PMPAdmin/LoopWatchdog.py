@@ -0,0 +1,140 @@
+"""Event-loop lag watchdog for the PMPAdmin package.
+
+A task on the loop sleeps ``TICK_SECONDS`` at a time and records how late it
+wakes up in ``pmpadmin_loop_lag_seconds`` (shown by ``perfstats``). Lag
+means something ran on the loop without yielding: every listener in the bot
+waits behind it.
+
+Lateness is only known once the loop is free again, by which time the
+culprit is gone, so a daemon thread also watches the task's heartbeat. When
+the heartbeat is more than ``STALL_THRESHOLD_SECONDS`` overdue it captures
+the loop thread's stack and the listener or command (and its cog) that was
+running, and logs them once per stall. The loop-side task then logs how long
+the stall lasted and counts it in ``pmpadmin_loop_stalls_total``.
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+import weakref
+from typing import Optional
+
+from . import Metrics
+from .Metrics import METRICS, current_cog
+
+log = logging.getLogger("red.pmpadmin.watchdog")
+
+TICK_SECONDS = 0.1
+STALL_THRESHOLD_SECONDS = 0.25
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+_TIMED_FILE = os.path.abspath(Metrics.__file__)
+
+_watchdogs: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def start_loop_watchdog(bot) -> None:
+    """Start watching the running loop for *bot*; no-op if already started."""
+    if bot not in _watchdogs:
+        watchdog = _watchdogs[bot] = LoopWatchdog(asyncio.get_running_loop())
+        watchdog.start()
+
+
+def stop_loop_watchdog(bot) -> None:
+    watchdog = _watchdogs.pop(bot, None)
+    if watchdog is not None:
+        watchdog.stop()
+
+
+class LoopWatchdog:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._reported_beat: Optional[float] = None
+        self._stop_event = threading.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lag = METRICS.histogram("pmpadmin_loop_lag_seconds")
+        self._stalls = METRICS.counter("pmpadmin_loop_stalls_total")
+
+    def start(self):
+        self._task = self._loop.create_task(self._tick())
+        self._thread = threading.Thread(target=self._monitor, name="pmpadmin-loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._task:
+            self._task.cancel()
+
+    # ------------------------------------------------------------------
+    # Loop side: measure lag
+    # ------------------------------------------------------------------
+    async def _tick(self):
+        while True:
+            self._heartbeat = time.monotonic()
+            expected = self._loop.time() + TICK_SECONDS
+            await asyncio.sleep(TICK_SECONDS)
+            lag = max(0.0, self._loop.time() - expected)
+            self._lag.observe(lag)
+            if lag > STALL_THRESHOLD_SECONDS:
+                self._stalls.inc()
+                if self._reported_beat is not None:
+                    log.warning("Event loop was blocked for %.0fms (stack logged above)", lag * 1000)
+                    self._reported_beat = None
+
+    # ------------------------------------------------------------------
+    # Watchdog thread: catch the loop while it is blocked
+    # ------------------------------------------------------------------
+    def _monitor(self):
+        while not self._stop_event.wait(TICK_SECONDS / 2):
+            beat = self._heartbeat
+            overdue = time.monotonic() - beat - TICK_SECONDS
+            if overdue > STALL_THRESHOLD_SECONDS and self._reported_beat != beat:
+                self._reported_beat = beat
+                try:
+                    self._report(overdue)
+                except Exception:
+                    log.exception("Loop watchdog failed to capture a stall")
+
+    def _report(self, overdue: float):
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return
+        cog, handler = self._running_handler(frame)
+        stack = traceback.extract_stack(frame)
+        del frame
+        ours = next(
+            (f for f in reversed(stack) if f.filename.startswith(PACKAGE_DIR) and f.filename != _TIMED_FILE), None
+        )
+
+        task = asyncio.current_task(self._loop)
+        if cog is None and task is not None and hasattr(task, "get_context"):
+            # not inside a timed handler; tasks a handler spawned still carry its cog
+            cog = task.get_context().get(current_cog)
+
+        log.warning(
+            "Event loop blocked for %.0fms+ in cog %s, handler %s, task %s, at %s\n%s",
+            overdue * 1000,
+            cog or "-",
+            handler or "-",
+            task.get_name() if task is not None else "-",
+            f"{ours.name} ({ours.filename}:{ours.lineno})" if ours else "code outside PMPAdmin",
+            "".join(traceback.format_list(stack)),
+        )
+
+    @staticmethod
+    def _running_handler(frame):
+        """Cog and function of the innermost listener/command wrapped by ``Metrics.timed`` on *frame*'s stack."""
+        while frame is not None:
+            code = frame.f_code
+            if code.co_name == "wrapper" and code.co_filename == _TIMED_FILE:
+                names = frame.f_locals
+                func = names.get("func")
+                return names.get("cog"), getattr(func, "__qualname__", None)
+            frame = frame.f_back
+        return None, None
@@ -0,0 +1,161 @@
+"""Shared member lookups for the PMPAdmin cogs.
+
+``guild.get_member`` only sees the gateway member cache, which is partial when
+member chunking is off, so lookups through it silently fail for anyone the bot
+hasn't seen recently. ``MemberResolver`` checks that cache first, then a small
+LRU of members resolved earlier, and only then asks Discord:
+
+* misses arriving within ``BATCH_WINDOW_SECONDS`` are grouped per guild and
+  answered with one member chunk query per 100 IDs;
+* concurrent lookups for the same member share a single request;
+* when chunk queries are unavailable (no members intent) or time out, each
+  miss falls back to ``fetch_member``, ``FETCH_CHUNK_SIZE`` at a time through
+  the shared ``RestScheduler`` at ``Priority.BULK``.
+
+Members that aren't in the guild are remembered for a shorter time so repeat
+lookups (e.g. summaries listing people who left) don't go back to Discord.
+"""
+import asyncio
+import logging
+import time
+import weakref
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import discord
+
+from .RestScheduler import Priority, RestScheduler, get_rest_scheduler
+
+log = logging.getLogger("red.pmpadmin.members")
+
+CACHE_SIZE = 5000
+CACHE_TTL_SECONDS = 600
+MISSING_TTL_SECONDS = 60
+BATCH_WINDOW_SECONDS = 0.05
+QUERY_CHUNK_SIZE = 100  # user_ids limit of a guild member chunk request
+FETCH_CHUNK_SIZE = 10
+
+_MISS = object()
+
+_resolvers: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def get_member_resolver(bot) -> "MemberResolver":
+    """Return the resolver shared by every cog of *bot*."""
+    resolver = _resolvers.get(bot)
+    if resolver is None:
+        resolver = _resolvers[bot] = MemberResolver(get_rest_scheduler(bot))
+    return resolver
+
+
+class MemberResolver:
+    def __init__(self, rest: RestScheduler):
+        self.rest = rest
+        # (guild_id, user_id) -> (expires_at, member or None), least recently used first
+        self._cache: "OrderedDict[Tuple[int, int], Tuple[float, Optional[discord.Member]]]" = OrderedDict()
+        self._inflight: Dict[Tuple[int, int], asyncio.Future] = {}
+        self._pending: Dict[int, List[int]] = {}
+        self._batchers: Dict[int, asyncio.Task] = {}
+        # cleared the first time Discord refuses a chunk query (members intent disabled)
+        self._can_query = True
+
+    def _cached(self, key: Tuple[int, int]):
+        entry = self._cache.get(key)
+        if entry is None:
+            return _MISS
+        if entry[0] < time.monotonic():
+            del self._cache[key]
+            return _MISS
+        self._cache.move_to_end(key)
+        return entry[1]
+
+    def _store(self, key: Tuple[int, int], member: Optional[discord.Member]):
+        ttl = CACHE_TTL_SECONDS if member is not None else MISSING_TTL_SECONDS
+        self._cache[key] = (time.monotonic() + ttl, member)
+        self._cache.move_to_end(key)
+        while len(self._cache) > CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    def forget(self, guild_id: int, user_id: int):
+        self._cache.pop((guild_id, user_id), None)
+
+    async def resolve(self, guild: discord.Guild, user_id: int, *, fresh: bool = False) -> Optional[discord.Member]:
+        """Return the member *user_id* of *guild*, or None if they aren't in it.
+
+        *fresh* skips the resolver's own cache, for callers that act on the
+        member's current roles.
+        """
+        member = guild.get_member(user_id)
+        if member is not None:
+            return member
+        key = (guild.id, user_id)
+        if not fresh:
+            hit = self._cached(key)
+            if hit is not _MISS:
+                return hit
+        future = self._inflight.get(key)
+        if future is None:
+            future = self._inflight[key] = asyncio.get_running_loop().create_future()
+            self._pending.setdefault(guild.id, []).append(user_id)
+            if guild.id not in self._batchers:
+                self._batchers[guild.id] = asyncio.create_task(self._run_batch(guild))
+        # shield: one caller being cancelled must not cancel the shared lookup
+        return await asyncio.shield(future)
+
+    async def resolve_many(self, guild: discord.Guild, user_ids: Iterable[int]) -> Dict[int, Optional[discord.Member]]:
+        ids = list(dict.fromkeys(user_ids))
+        members = await asyncio.gather(*(self.resolve(guild, uid) for uid in ids))
+        return dict(zip(ids, members))
+
+    async def _run_batch(self, guild: discord.Guild):
+        await asyncio.sleep(BATCH_WINDOW_SECONDS)
+        # lookups from here on open the next batch
+        self._batchers.pop(guild.id, None)
+        ids = self._pending.pop(guild.id, [])
+        found: Dict[int, discord.Member] = {}
+        unanswered = ids
+        try:
+            if self._can_query:
+                unanswered = []
+                for start in range(0, len(ids), QUERY_CHUNK_SIZE):
+                    chunk = ids[start:start + QUERY_CHUNK_SIZE]
+                    try:
+                        members = await guild.query_members(user_ids=chunk, limit=len(chunk))
+                    except discord.ClientException:
+                        log.info("Member chunk queries unavailable; falling back to fetch_member")
+                        self._can_query = False
+                        unanswered.extend(ids[start:])
+                        break
+                    except asyncio.TimeoutError:
+                        unanswered.extend(chunk)
+                        continue
+                    found.update((m.id, m) for m in members)
+            # a completed chunk query is authoritative: IDs it didn't return aren't members
+            fetched = []
+            for start in range(0, len(unanswered), FETCH_CHUNK_SIZE):
+                chunk = unanswered[start:start + FETCH_CHUNK_SIZE]
+                fetched.extend(await asyncio.gather(*(self._fetch(guild, uid) for uid in chunk)))
+            found.update((uid, m) for uid, m in zip(unanswered, fetched) if m is not None and m is not _MISS)
+            failed = {uid for uid, m in zip(unanswered, fetched) if m is _MISS}
+            for uid in ids:
+                member = found.get(uid)
+                if uid not in failed:
+                    self._store((guild.id, uid), member)
+                self._settle(guild.id, uid, member)
+        finally:
+            for uid in ids:
+                self._settle(guild.id, uid, None)
+
+    async def _fetch(self, guild: discord.Guild, user_id: int):
+        try:
+            return await self.rest.run(Priority.BULK, guild.fetch_member, user_id)
+        except discord.NotFound:
+            return None
+        except discord.HTTPException as e:
+            log.warning("fetch_member(%s) in guild %s failed: %s", user_id, guild.id, e)
+            return _MISS
+
+    def _settle(self, guild_id: int, user_id: int, member: Optional[discord.Member]):
+        future = self._inflight.pop((guild_id, user_id), None)
+        if future is not None and not future.done():
+            future.set_result(member)
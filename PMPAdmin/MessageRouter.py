@@ -0,0 +1,135 @@
+"""Single on_message / on_message_edit entry point for the PMPAdmin cogs.
+
+Each cog used to register its own listeners, and each of them awaited a
+Config read for every guild message just to learn it wasn't interested.
+Cogs now register their handlers here together with the channels they care
+about, taken from their config at load and kept current by their commands.
+The router keeps a flat ``channel_id -> handlers`` map per event, so a
+message nobody watches costs one dict lookup (two for threads, whose parent
+channel is also checked).
+
+Messages from bots are never routed; none of the cogs act on them.
+"""
+import asyncio
+import logging
+import weakref
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import discord
+
+from .Metrics import timed
+
+log = logging.getLogger("red.pmpadmin.router")
+
+EVENTS = ("on_message", "on_message_edit")
+
+_routers: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def get_message_router(bot) -> "MessageRouter":
+    """Return the router shared by every cog of *bot*."""
+    router = _routers.get(bot)
+    if router is None:
+        router = _routers[bot] = MessageRouter(bot)
+    return router
+
+
+class MessageRouter:
+    def __init__(self, bot):
+        self.bot = bot
+        # owner -> {event: handler}; on_message handlers take (message),
+        # on_message_edit handlers take (before, after)
+        self._handlers: Dict[str, Dict[str, Callable]] = {}
+        # owner -> {guild_id: {channel_id, …}}
+        self._channels: Dict[str, Dict[int, Set[int]]] = {}
+        # event -> {channel_id: (handler, …)}, rebuilt from the two maps above
+        self._routes: Dict[str, Dict[int, Tuple[Callable, ...]]] = {event: {} for event in EVENTS}
+        self._listening = False
+
+    # ------------------------------------------------------------------
+    # Registration
+    # ------------------------------------------------------------------
+    def register(self, owner: str, **handlers: Callable):
+        """Register *owner*'s handlers, e.g. ``register("TalkModerator", on_message=...)``."""
+        unknown = set(handlers) - set(EVENTS)
+        if unknown:
+            raise ValueError(f"Unsupported events: {', '.join(sorted(unknown))}")
+        self._handlers[owner] = {
+            event: timed(handler, owner, "pmpadmin_listener", listener=event) for event, handler in handlers.items()
+        }
+        self._channels.setdefault(owner, {})
+        self._rebuild()
+        if not self._listening:
+            self.bot.add_listener(self._on_message, "on_message")
+            self.bot.add_listener(self._on_message_edit, "on_message_edit")
+            self._listening = True
+
+    def unregister(self, owner: str):
+        self._handlers.pop(owner, None)
+        self._channels.pop(owner, None)
+        self._rebuild()
+        if not self._handlers and self._listening:
+            self.bot.remove_listener(self._on_message, "on_message")
+            self.bot.remove_listener(self._on_message_edit, "on_message_edit")
+            self._listening = False
+
+    def set_channels(self, owner: str, guild_id: int, channel_ids: Iterable[Optional[int]]):
+        """Replace the channels *owner* watches in *guild_id*; ``None`` entries are ignored."""
+        ids = {int(cid) for cid in channel_ids if cid is not None}
+        guilds = self._channels.setdefault(owner, {})
+        if ids:
+            guilds[guild_id] = ids
+        else:
+            guilds.pop(guild_id, None)
+        self._rebuild()
+
+    def channels(self, owner: str, guild_id: int) -> Set[int]:
+        return self._channels.get(owner, {}).get(guild_id, set())
+
+    def snapshot(self) -> Dict[str, Dict[int, List[int]]]:
+        """Copy of every owner's watched channels, ``{owner: {guild_id: [channel_id, …]}}``."""
+        return {
+            owner: {gid: sorted(cids) for gid, cids in guilds.items()}
+            for owner, guilds in self._channels.items()
+        }
+
+    def _rebuild(self):
+        routes: Dict[str, Dict[int, list]] = {event: {} for event in EVENTS}
+        for owner, handlers in self._handlers.items():
+            for channel_ids in self._channels.get(owner, {}).values():
+                for cid in channel_ids:
+                    for event, handler in handlers.items():
+                        routes[event].setdefault(cid, []).append(handler)
+        self._routes = {event: {cid: tuple(hs) for cid, hs in m.items()} for event, m in routes.items()}
+
+    # ------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------
+    def _match(self, event: str, message: discord.Message) -> Tuple[Callable, ...]:
+        routes = self._routes[event]
+        channel = message.channel
+        handlers = routes.get(channel.id)
+        if handlers is None:
+            # threads (incl. forum posts) are routed by their parent channel
+            parent_id = getattr(channel, "parent_id", None)
+            handlers = routes.get(parent_id, ()) if parent_id else ()
+        return handlers
+
+    async def _on_message(self, message: discord.Message):
+        handlers = self._match("on_message", message)
+        if handlers and not message.author.bot:
+            await self._dispatch(handlers, message)
+
+    async def _on_message_edit(self, before: discord.Message, after: discord.Message):
+        handlers = self._match("on_message_edit", after)
+        if handlers and not after.author.bot:
+            await self._dispatch(handlers, before, after)
+
+    @staticmethod
+    async def _dispatch(handlers: Tuple[Callable, ...], *args):
+        # handlers run concurrently, as separate listeners would, so one that
+        # sleeps (e.g. TalkModerator's reminder) never delays the others
+        results = await asyncio.gather(*(h(*args) for h in handlers), return_exceptions=True)
+        for handler, result in zip(handlers, results):
+            if isinstance(result, Exception):
+                log.error("Message handler %s failed", getattr(handler, "__qualname__", handler), exc_info=result)
@@ -0,0 +1,237 @@
+"""Counters and latency histograms for the PMPAdmin cogs.
+
+Every cog shares the module-level ``METRICS`` registry. Recording costs a
+perf_counter pair, a bisect and two attribute updates, so it stays on for
+every listener, command and outbound call:
+
+* ``instrument_cog`` wraps a cog's listeners and command callbacks before the
+  cog is added to the bot; MessageRouter wraps the handlers it dispatches.
+* ``install_http_hooks`` wraps the bot's Discord REST client so each request
+  is timed per route template and attributed to the cog whose listener or
+  command made it, and counts the 429s discord.py reports on its logger.
+
+The registry is not thread-safe: only record from the event loop thread.
+"""
+import bisect
+import contextvars
+import functools
+import logging
+import os
+import re
+from time import perf_counter
+from typing import Callable, Dict, List, Tuple
+from urllib.parse import urlparse
+
+import discord
+
+# Upper bounds (seconds) of the latency buckets; the last bucket is +Inf.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PROMETHEUS_PATH = os.path.join("data", "PMPAdmin", "metrics.prom")
+
+# Cog whose listener/command is running; tasks it creates inherit it.
+current_cog: contextvars.ContextVar = contextvars.ContextVar("pmpadmin_current_cog", default="-")
+
+Labels = Tuple[Tuple[str, str], ...]
+
+_SNOWFLAKE = re.compile(r"\d{15,}")
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: int = 1):
+        self.value += amount
+
+
+class Gauge:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the *q* quantile (inf if past the last bucket)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class Metrics:
+    def __init__(self):
+        self.counters: Dict[Tuple[str, Labels], Counter] = {}
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self.gauges: Dict[Tuple[str, Labels], Gauge] = {}
+
+    # Look a series up once and keep it: the returned object is updated in place.
+    def counter(self, name: str, **labels: str) -> Counter:
+        key = (name, tuple(sorted(labels.items())))
+        series = self.counters.get(key)
+        if series is None:
+            series = self.counters[key] = Counter()
+        return series
+
+    def gauge(self, name: str, **labels: str) -> Gauge:
+        key = (name, tuple(sorted(labels.items())))
+        series = self.gauges.get(key)
+        if series is None:
+            series = self.gauges[key] = Gauge()
+        return series
+
+    def histogram(self, name: str, **labels: str) -> Histogram:
+        key = (name, tuple(sorted(labels.items())))
+        series = self.histograms.get(key)
+        if series is None:
+            series = self.histograms[key] = Histogram()
+        return series
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+        typed = set()
+        for (name, labels), h in sorted(self.histograms.items()):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, n in zip(BUCKETS, h.counts):
+                cumulative += n
+                lines.append(f"{name}_bucket{_fmt_labels(labels + (('le', repr(bound)),))} {cumulative}")
+            lines.append(f"{name}_bucket{_fmt_labels(labels + (('le', '+Inf'),))} {h.count}")
+            lines.append(f"{name}_sum{_fmt_labels(labels)} {h.total}")
+            lines.append(f"{name}_count{_fmt_labels(labels)} {h.count}")
+        for (name, labels), c in sorted(self.counters.items()):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{_fmt_labels(labels)} {c.value}")
+        for (name, labels), g in sorted(self.gauges.items()):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name}{_fmt_labels(labels)} {g.value}")
+        return "\n".join(lines) + "\n"
+
+
+def _fmt_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def write_prometheus(text: str, path: str = PROMETHEUS_PATH):
+    """Atomically replace the Prometheus text file (blocking; run in a thread)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+METRICS = Metrics()
+
+
+def timed(func: Callable, cog: str, family: str, **labels: str) -> Callable:
+    """Wrap coroutine function *func* to record ``<family>_seconds`` and ``<family>_errors_total``."""
+    hist = METRICS.histogram(f"{family}_seconds", cog=cog, **labels)
+    errors = METRICS.counter(f"{family}_errors_total", cog=cog, **labels)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        token = current_cog.set(cog)
+        started = perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        except Exception:
+            errors.inc()
+            raise
+        finally:
+            hist.observe(perf_counter() - started)
+            current_cog.reset(token)
+
+    return wrapper
+
+
+def instrument_cog(cog) -> None:
+    """Time *cog*'s listeners and commands. Call before ``bot.add_cog``."""
+    name = cog.qualified_name
+    # add_cog registers getattr(cog, method_name), so an instance attribute wins
+    for event, method in cog.get_listeners():
+        setattr(cog, method.__name__, timed(method, name, "pmpadmin_listener", listener=event))
+    for command in cog.walk_commands():
+        command.callback = timed(command.callback, name, "pmpadmin_command", command=command.qualified_name)
+
+
+class _RateLimitCounter(logging.Handler):
+    """Counts the rate-limit warnings discord.py logs before it sleeps and retries."""
+
+    def emit(self, record: logging.LogRecord):
+        if "rate limit" not in str(record.msg):
+            return
+        route = "global"
+        if isinstance(record.args, tuple) and len(record.args) >= 2:
+            path = _SNOWFLAKE.sub("{id}", urlparse(str(record.args[1])).path)
+            route = f"{record.args[0]} {path}"
+        METRICS.counter("pmpadmin_discord_ratelimits_total", cog=current_cog.get(), route=route).inc()
+
+
+_rate_limit_handler = _RateLimitCounter(level=logging.WARNING)
+
+
+def install_http_hooks(bot) -> None:
+    http = bot.http
+    if "request" in vars(http):
+        return
+    original = http.request
+
+    @functools.wraps(original)
+    async def request(route, **kwargs):
+        cog = current_cog.get()
+        started = perf_counter()
+        try:
+            return await original(route, **kwargs)
+        except discord.HTTPException as e:
+            METRICS.counter(
+                "pmpadmin_discord_request_errors_total", cog=cog, method=route.method, route=route.path, status=str(e.status)
+            ).inc()
+            raise
+        finally:
+            METRICS.histogram(
+                "pmpadmin_discord_request_seconds", cog=cog, method=route.method, route=route.path
+            ).observe(perf_counter() - started)
+
+    http.request = request
+    logging.getLogger("discord.http").addHandler(_rate_limit_handler)
+
+
+def uninstall_http_hooks(bot) -> None:
+    vars(bot.http).pop("request", None)
+    logging.getLogger("discord.http").removeHandler(_rate_limit_handler)
@@ -1,17 +1,28 @@
 # -*- coding: utf-8 -*-
+import asyncio
+import logging
 import discord
-from redbot.core import commands
+from redbot.core import commands, checks
+from redbot.core.utils.chat_formatting import box, pagify
 from discord.ext import tasks
 from datetime import datetime, timezone, time
 from zoneinfo import ZoneInfo 
 from collections import defaultdict
 
+from .Metrics import METRICS, write_prometheus
+from .RestScheduler import Priority, get_rest_scheduler
+
+log = logging.getLogger("red.pmpadmin")
+
 # Define DDAY as Midnight on Feb 24 UTC
 DDAY_DATE = datetime(2025, 2, 24, 0, 0, 0, tzinfo=timezone.utc)
 
 LA_TZ = ZoneInfo("America/Los_Angeles")
 DATE_DAILY_SCHEDULE = time(hour=9, minute=0, tzinfo=LA_TZ)
 
+# How often the Prometheus text file is rewritten
+METRICS_EXPORT_SECONDS = 15
+
 #
 # ROLE IDs
 #
@@ -127,13 +138,16 @@ def getDaysInServerWithDDAY(now, join_date):
 class PMPAdmin(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.rest = get_rest_scheduler(bot)
         self.dailyCheck.start()
+        self.exportMetrics.start()
     
     def get_guild(self):
         return self.bot.get_guild(1172411527870034000)
     
     def cog_unload(self):
         self.dailyCheck.cancel()
+        self.exportMetrics.cancel()
 
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
@@ -142,10 +156,10 @@ class PMPAdmin(commands.Cog):
 
         console_channel = self.bot.get_channel(CHANNEL_ID_CONSOLE)
         try:
-            await member.send(UNVERIFIED_DM)
+            await self.rest.run(Priority.NOTICES, member.send, UNVERIFIED_DM)
         except discord.Forbidden:
             if console_channel:
-                await console_channel.send(f"Could not send unverified DM to {member.display_name} (DMs closed).")
+                await self.rest.run(Priority.NOTICES, console_channel.send, f"Could not send unverified DM to {member.display_name} (DMs closed).")
 
     @commands.Cog.listener()
     async def on_member_update(self, before: discord.Member, after: discord.Member):
@@ -156,13 +170,13 @@ class PMPAdmin(commands.Cog):
 
             if any(role.id == ROLE_ID_MEMBER for role in added_roles):
                 try:
-                    await after.send(VERIFIED_DM)
+                    await self.rest.run(Priority.NOTICES, after.send, VERIFIED_DM)
                 except discord.Forbidden:
                     if console_channel:
-                        await console_channel.send(f"Could not send verified DM to {after.display_name} (DMs closed).")
+                        await self.rest.run(Priority.NOTICES, console_channel.send, f"Could not send verified DM to {after.display_name} (DMs closed).")
 
                 if verification_channel:
-                    await verification_channel.send(f"Welcome **{after.display_name}**, now a full member of the community!🎉")
+                    await self.rest.run(Priority.NOTICES, verification_channel.send, f"Welcome **{after.display_name}**, now a full member of the community!🎉")
 
     @tasks.loop(time=DATE_DAILY_SCHEDULE)
     async def dailyCheck(self):
@@ -173,7 +187,55 @@ class PMPAdmin(commands.Cog):
     async def before_dailyCheck(self):
         console_channel = self.bot.get_channel(CHANNEL_ID_CONSOLE)
         if console_channel:
-            await console_channel.send("🤖 Registered daily verification check at 9am")
+            await self.rest.run(Priority.NOTICES, console_channel.send, "🤖 Registered daily verification check at 9am")
+
+    @tasks.loop(seconds=METRICS_EXPORT_SECONDS)
+    async def exportMetrics(self):
+        """Write the package metrics in Prometheus text format for the local agent to scrape."""
+        try:
+            await asyncio.to_thread(write_prometheus, METRICS.render_prometheus())
+        except OSError:
+            log.exception("Could not write metrics file")
+
+    @commands.command()
+    @checks.admin_or_permissions(manage_guild=True)
+    async def perfstats(self, ctx, search: str = ""):
+        """Show latency percentiles and error counts for listeners, commands and API calls.
+
+        Pass a word (e.g. `command`, `discord`, `RoleAssignment`) to only show matching rows.
+        """
+        def ms(seconds):
+            return ">30s" if seconds == float("inf") else f"{seconds * 1000:.0f}ms"
+
+        lines = [f"{'metric':<18} {'labels':<48} {'count':>7} {'p50':>6} {'p95':>6} {'p99':>6}"]
+        for (name, labels), h in sorted(METRICS.histograms.items()):
+            family = name.removeprefix("pmpadmin_").removesuffix("_seconds")
+            label_text = " ".join(v for _, v in labels)
+            if not h.count or search.lower() not in f"{family} {label_text}".lower():
+                continue
+            lines.append(
+                f"{family:<18} {label_text[:48]:<48} {h.count:>7} "
+                f"{ms(h.quantile(0.5)):>6} {ms(h.quantile(0.95)):>6} {ms(h.quantile(0.99)):>6}"
+            )
+
+        counts = []
+        for (name, labels), c in sorted(METRICS.counters.items()):
+            family = name.removeprefix("pmpadmin_").removesuffix("_total")
+            label_text = " ".join(v for _, v in labels)
+            if c.value and search.lower() in f"{family} {label_text}".lower():
+                counts.append(f"{family:<30} {label_text[:56]:<56} {c.value:>7}")
+        for (name, labels), g in sorted(METRICS.gauges.items()):
+            family = name.removeprefix("pmpadmin_")
+            label_text = " ".join(v for _, v in labels)
+            if g.value and search.lower() in f"{family} {label_text}".lower():
+                counts.append(f"{family:<30} {label_text[:56]:<56} {g.value:>7}")
+        if counts:
+            lines += ["", *counts]
+
+        if len(lines) == 1:
+            return await ctx.send("No matching measurements yet.")
+        for page in pagify("\n".join(lines), page_length=1900):
+            await ctx.send(box(page))
 
     @commands.command()
     async def testMessaging(self, ctx):
@@ -230,7 +292,7 @@ class PMPAdmin(commands.Cog):
         unverified_members = getUnverifiedMembers(PMP)
 
         if not unverified_members:
-            await console_channel.send("✅ No unverified members to remind!")
+            await self.rest.run(Priority.NOTICES, console_channel.send, "✅ No unverified members to remind!")
             return
 
         now = discord.utils.utcnow()
@@ -241,7 +303,7 @@ class PMPAdmin(commands.Cog):
             message += f"📌 {member.mention} - you have {days_remaining} days remaining to get verified!\n"
 
         # Send the verification message in the verification channel
-        await verification_channel.send(message)
+        await self.rest.run(Priority.NOTICES, verification_channel.send, message)
 
 
     # This used to be a command, but at the end of the day, admins don't need to call it manually, so note the removal of the
@@ -265,16 +327,16 @@ class PMPAdmin(commands.Cog):
             days_in_server = getDaysInServerWithDDAY(now, join_date)
             if days_in_server >= days_max_before_kick:
                 try:
-                    await member.kick(reason=f"Unverified for more than {days_in_server} days")
+                    await self.rest.run(Priority.MODERATION, member.kick, reason=f"Unverified for more than {days_in_server} days")
                     kicked_members.append(f"{member.display_name} ({days_in_server} days)")
                 except discord.Forbidden:
-                    await console_channel.send(f"⚠️ Could not kick {member.display_name} (missing permissions).")
+                    await self.rest.run(Priority.NOTICES, console_channel.send, f"⚠️ Could not kick {member.display_name} (missing permissions).")
                 except discord.HTTPException:
-                    await console_channel.send(f"⚠️ Failed to kick {member.display_name} due to a Discord error.")
+                    await self.rest.run(Priority.NOTICES, console_channel.send, f"⚠️ Failed to kick {member.display_name} due to a Discord error.")
 
         # Send a summary of kicked members
         if kicked_members:
             kicked_list = "\n".join(kicked_members)
-            await console_channel.send(f"🦶 **Bot kicked the following Unverified Members:**\n```\n{kicked_list}```")
+            await self.rest.run(Priority.NOTICES, console_channel.send, f"🦶 **Bot kicked the following Unverified Members:**\n```\n{kicked_list}```")
         else:
-            await console_channel.send("✅ No members to kick today.")
+            await self.rest.run(Priority.NOTICES, console_channel.send, "✅ No members to kick today.")
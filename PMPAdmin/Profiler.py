@@ -0,0 +1,223 @@
+"""On-demand profiling of the running bot.
+
+``profile [seconds] [mode]`` (bot owner only) profiles the event loop thread
+for a bounded window and uploads a text report with the top functions by
+cumulative time and the top allocation sites seen by tracemalloc. Two modes:
+
+* ``sample`` (default): a background thread samples the loop thread's stack
+  every ``SAMPLE_INTERVAL_SECONDS``. Cheap enough for production; a function's
+  share of samples approximates its share of wall time on the loop.
+* ``cprofile``: deterministic profiling with exact call counts, at a
+  noticeable cost per Python call while it runs.
+
+Nothing is installed outside a profiling window, so the cog costs nothing
+when idle. Rows from the PMPAdmin package are repeated in their own section
+so the cogs' own code isn't lost among discord.py and asyncio internals.
+"""
+import asyncio
+import cProfile
+import io
+import logging
+import os
+import pstats
+import re
+import sys
+import sysconfig
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timezone
+from typing import List, Tuple
+
+import discord
+from redbot.core import commands
+
+log = logging.getLogger("red.pmpadmin.profiler")
+
+DEFAULT_SECONDS = 30
+MAX_SECONDS = 300
+SAMPLE_INTERVAL_SECONDS = 0.005
+TRACEMALLOC_FRAMES = 10
+TOP_ROWS = 40
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+# trimmed from file names in the report, longest first
+_PATH_PREFIXES = sorted({p for k, p in sysconfig.get_paths().items() if k in ("purelib", "platlib", "stdlib")}, key=len, reverse=True)
+
+Frame = Tuple[str, int, str]
+
+
+class _StackSampler(threading.Thread):
+    """Counts which functions are on *target*'s stack at each sample."""
+
+    def __init__(self, target: int):
+        super().__init__(name="pmpadmin-profiler", daemon=True)
+        self._target = target
+        self._stop_event = threading.Event()
+        self.samples = 0
+        # functions on the stack (cumulative) and at its top (self time)
+        self.cumulative: Counter = Counter()
+        self.own: Counter = Counter()
+
+    def run(self):
+        while not self._stop_event.wait(SAMPLE_INTERVAL_SECONDS):
+            frame = sys._current_frames().get(self._target)
+            if frame is None:
+                continue
+            self.samples += 1
+            self.own[_frame_key(frame)] += 1
+            seen = set()
+            while frame is not None:
+                seen.add(_frame_key(frame))
+                frame = frame.f_back
+            # count recursive functions once per sample
+            self.cumulative.update(seen)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def _frame_key(frame) -> Frame:
+    code = frame.f_code
+    return code.co_filename, code.co_firstlineno, code.co_name
+
+
+def _is_ours(filename: str) -> bool:
+    return os.path.abspath(filename).startswith(PACKAGE_DIR)
+
+
+def _short(filename: str) -> str:
+    if _is_ours(filename):
+        return os.path.relpath(filename, os.path.dirname(PACKAGE_DIR))
+    for prefix in _PATH_PREFIXES:
+        if filename.startswith(prefix + os.sep):
+            return filename[len(prefix) + 1:]
+    return filename
+
+
+class Profiler(commands.Cog):
+    """Owner-only CPU and allocation profiling of the running bot."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._running = False
+
+    @commands.command()
+    @commands.is_owner()
+    async def profile(self, ctx: commands.Context, seconds: int = DEFAULT_SECONDS, mode: str = "sample"):
+        """Profile the bot for `seconds` (max 300) and upload the report.
+
+        `mode` is `sample` (low overhead, default) or `cprofile` (exact call counts, slower while running).
+        """
+        mode = mode.lower()
+        if mode not in ("sample", "cprofile"):
+            return await ctx.send("Mode must be `sample` or `cprofile`.")
+        if self._running:
+            return await ctx.send("A profile is already running.")
+        seconds = max(1, min(seconds, MAX_SECONDS))
+        self._running = True
+        try:
+            await ctx.send(f"⏱️ Profiling for {seconds}s ({mode})…")
+            report = await self._capture(seconds, mode)
+        finally:
+            self._running = False
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+        file = discord.File(io.BytesIO(report.encode()), filename=f"profile-{stamp}.txt")
+        await ctx.send("Profile finished.", file=file)
+
+    async def _capture(self, seconds: int, mode: str) -> str:
+        # leave tracemalloc alone if something else already started it
+        own_tracemalloc = not tracemalloc.is_tracing()
+        if own_tracemalloc:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        # a baseline only tells us something when tracing was already running
+        baseline = None if own_tracemalloc else await asyncio.to_thread(tracemalloc.take_snapshot)
+        sampler = profiler = None
+        started = time.perf_counter()
+        if mode == "sample":
+            sampler = _StackSampler(threading.get_ident())
+            sampler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            if profiler:
+                profiler.disable()
+            if sampler:
+                await asyncio.to_thread(sampler.stop)
+            elapsed = time.perf_counter() - started
+            snapshot = await asyncio.to_thread(tracemalloc.take_snapshot)
+            if own_tracemalloc:
+                tracemalloc.stop()
+        return await asyncio.to_thread(self._report, mode, elapsed, profiler, sampler, baseline, snapshot)
+
+    # ------------------------------------------------------------------
+    # Report (runs in a worker thread)
+    # ------------------------------------------------------------------
+    def _report(self, mode, elapsed, profiler, sampler, baseline, snapshot) -> str:
+        out = io.StringIO()
+        out.write(f"PMPAdmin profile: {mode}, {elapsed:.1f}s, {datetime.now(timezone.utc).isoformat(timespec='seconds')}\n\n")
+        if profiler is not None:
+            self._write_cprofile(out, profiler)
+        else:
+            self._write_samples(out, sampler)
+        self._write_allocations(out, baseline, snapshot)
+        return out.getvalue()
+
+    @staticmethod
+    def _write_cprofile(out: io.StringIO, profiler: cProfile.Profile):
+        stats = pstats.Stats(profiler, stream=out)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE)
+        out.write("== Top functions by cumulative time ==\n")
+        stats.print_stats(TOP_ROWS)
+        out.write("== PMPAdmin functions by cumulative time ==\n")
+        stats.print_stats(re.escape(PACKAGE_DIR), TOP_ROWS)
+
+    @staticmethod
+    def _write_samples(out: io.StringIO, sampler: _StackSampler):
+        total = sampler.samples
+        out.write(f"{total} samples every {SAMPLE_INTERVAL_SECONDS * 1000:.0f}ms of the event loop thread\n")
+        if not total:
+            return
+
+        def table(title: str, rows: List[Tuple[Frame, int]]):
+            out.write(f"\n== {title} ==\n{'cum %':>7} {'self %':>7}  function\n")
+            for key, n in rows:
+                filename, line, name = key
+                out.write(f"{n / total:>7.1%} {sampler.own.get(key, 0) / total:>7.1%}  {name} ({_short(filename)}:{line})\n")
+
+        ranked = sampler.cumulative.most_common()
+        table("Top functions by cumulative samples", ranked[:TOP_ROWS])
+        table("PMPAdmin functions by cumulative samples", [(k, n) for k, n in ranked if _is_ours(k[0])][:TOP_ROWS])
+
+    @staticmethod
+    def _write_allocations(out: io.StringIO, baseline, snapshot):
+        filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ]
+        snapshot = snapshot.filter_traces(filters)
+
+        out.write("\n== Top allocation sites (live at the end of the window) ==\n")
+        for stat in snapshot.statistics("lineno")[:TOP_ROWS]:
+            frame = stat.traceback[0]
+            out.write(f"{stat.size / 1024:>10.1f} KiB {stat.count:>8} blocks  {_short(frame.filename)}:{frame.lineno}\n")
+
+        if baseline is not None:
+            out.write("\n== Growth during the window ==\n")
+            for stat in snapshot.compare_to(baseline.filter_traces(filters), "lineno")[:TOP_ROWS]:
+                frame = stat.traceback[0]
+                out.write(
+                    f"{stat.size_diff / 1024:>+10.1f} KiB {stat.count_diff:>+8} blocks  {_short(frame.filename)}:{frame.lineno}\n"
+                )
+
+        ours = snapshot.filter_traces([tracemalloc.Filter(True, os.path.join(PACKAGE_DIR, "*"), all_frames=True)])
+        out.write("\n== Allocations with PMPAdmin code on the stack (by call stack) ==\n")
+        for stat in ours.statistics("traceback")[:10]:
+            out.write(f"{stat.size / 1024:.1f} KiB in {stat.count} blocks\n")
+            for line in stat.traceback.format(limit=TRACEMALLOC_FRAMES, most_recent_first=True):
+                out.write(f"    {line}\n")
@@ -0,0 +1,115 @@
+"""Priority-aware scheduling of the PMPAdmin cogs' outbound Discord calls.
+
+Every cog shares one ``RestScheduler`` per bot. Calls go through
+``scheduler.run(priority, coroutine_function, *args, **kwargs)`` and start
+only when a slot is free:
+
+* at most ``MAX_IN_FLIGHT`` calls run at once across all cogs;
+* each priority class has its own concurrency limit (``LIMITS``), so a bulk
+  job such as ``ytpl scrapeall`` or ``rolepopulate`` never holds more than
+  one slot and interactive actions always find room;
+* when a slot frees up, waiters of the most urgent class go first.
+
+Queue depth per class is exported as ``pmpadmin_rest_queue_depth`` and the
+time spent waiting as ``pmpadmin_rest_queue_wait_seconds``.
+
+Don't call ``run`` from inside a function that is itself being run by the
+scheduler: the outer call holds its slot while the inner one waits.
+"""
+import asyncio
+import enum
+import weakref
+from collections import deque
+from time import perf_counter
+from typing import Awaitable, Callable, Deque, List, TypeVar
+
+from .Metrics import METRICS
+
+T = TypeVar("T")
+
+
+class Priority(enum.IntEnum):
+    MODERATION = 0  # deleting rule-breaking messages, kicks
+    ROLES = 1  # reaction-role grants and removals
+    NOTICES = 2  # summaries, reminders, DMs and console reports
+    BULK = 3  # back-fill reactions
+
+
+LIMITS = {
+    Priority.MODERATION: 4,
+    Priority.ROLES: 3,
+    Priority.NOTICES: 2,
+    Priority.BULK: 1,
+}
+MAX_IN_FLIGHT = 6
+
+_schedulers: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def get_rest_scheduler(bot) -> "RestScheduler":
+    """Return the scheduler shared by every cog of *bot*."""
+    scheduler = _schedulers.get(bot)
+    if scheduler is None:
+        scheduler = _schedulers[bot] = RestScheduler()
+    return scheduler
+
+
+class RestScheduler:
+    def __init__(self):
+        self._in_flight = 0
+        self._active: List[int] = [0] * len(Priority)
+        self._waiters: List[Deque[asyncio.Future]] = [deque() for _ in Priority]
+        self._depth = [METRICS.gauge("pmpadmin_rest_queue_depth", priority=p.name.lower()) for p in Priority]
+        self._wait = [METRICS.histogram("pmpadmin_rest_queue_wait_seconds", priority=p.name.lower()) for p in Priority]
+
+    async def run(self, priority: Priority, func: Callable[..., Awaitable[T]], /, *args, **kwargs) -> T:
+        """Await ``func(*args, **kwargs)`` once *priority* gets a slot."""
+        await self._acquire(priority)
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            self._release(priority)
+
+    def _can_start(self, priority: Priority) -> bool:
+        return self._in_flight < MAX_IN_FLIGHT and self._active[priority] < LIMITS[priority]
+
+    def _start(self, priority: Priority):
+        self._in_flight += 1
+        self._active[priority] += 1
+
+    async def _acquire(self, priority: Priority):
+        waiters = self._waiters[priority]
+        # a free slot with more urgent waiters queued would already have been handed to them
+        if not waiters and self._can_start(priority):
+            self._start(priority)
+            self._wait[priority].observe(0.0)
+            return
+        future = asyncio.get_running_loop().create_future()
+        waiters.append(future)
+        self._depth[priority].set(len(waiters))
+        started = perf_counter()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # granted a slot just as we were cancelled; pass it on
+                self._release(priority)
+            else:
+                waiters.remove(future)
+                self._depth[priority].set(len(waiters))
+            raise
+        self._wait[priority].observe(perf_counter() - started)
+
+    def _release(self, priority: Priority):
+        self._in_flight -= 1
+        self._active[priority] -= 1
+        for p in Priority:
+            waiters = self._waiters[p]
+            while waiters and self._can_start(p):
+                future = waiters.popleft()
+                if not future.done():
+                    self._start(p)
+                    future.set_result(None)
+            self._depth[p].set(len(waiters))
+            if self._in_flight >= MAX_IN_FLIGHT:
+                break
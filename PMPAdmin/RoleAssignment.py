@@ -1,77 +1,330 @@
+import asyncio
+import logging
 import os
 import sqlite3
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Union
+
 import discord
 from redbot.core import commands
 
+from .MemberResolver import get_member_resolver
+from .RestScheduler import Priority, get_rest_scheduler
+
+log = logging.getLogger("red.roleassignment")
+
+# Writes arriving within this window are committed in one transaction.
+WRITE_COALESCE_SECONDS = 0.05
+# Spacing between reactions added to messages in the same channel; Discord's
+# reaction bucket allows roughly one per 250ms.
+REACTION_INTERVAL_SECONDS = 0.3
+# Reaction-role changes for one member are collected this long, then applied
+# as a single member edit.
+ROLE_COALESCE_SECONDS = 1.5
+ROLE_EDIT_ATTEMPTS = 3
+# How long roles returned by our own edit are trusted over the member cache,
+# which only catches up when the gateway's member update arrives.
+ROLE_EDIT_MEMORY_SECONDS = 10
+# Startup reconciliation: bounded queue of member edits drained by a few
+# paced workers, so a large backlog never floods the member-update bucket.
+RECONCILE_WORKERS = 2
+RECONCILE_QUEUE_SIZE = 100
+RECONCILE_EDIT_INTERVAL = 0.5
+# Revoking a role from more than this share of its holders (and more than
+# RECONCILE_MIN_CAPPED of them) looks like lost reactions, not people leaving.
+RECONCILE_MAX_REVOKE_SHARE = 0.5
+RECONCILE_MIN_CAPPED = 5
+
+Statement = Tuple[str, Sequence]
+EmojiKey = Union[int, str]
+
+
+def _emoji_key(emoji: str) -> EmojiKey:
+    """Lookup key for a stored emoji string: the ID of a custom emoji, else the unicode text.
+
+    Matches ``payload.emoji.id or payload.emoji.name`` without building a string.
+    """
+    if emoji.startswith("<") and emoji.endswith(">"):
+        tail = emoji[1:-1].rsplit(":", 1)[-1]
+        if tail.isdigit():
+            return int(tail)
+    return emoji
+
+
+class AsyncSQLite:
+    """Runs one sqlite3 connection on a dedicated thread so the event loop never waits on disk.
+
+    The database uses WAL journaling. Writes are queued and every write
+    submitted within WRITE_COALESCE_SECONDS is committed in a single
+    transaction; `write_many` keeps its statements in one unit. Reads first
+    flush pending writes so callers always see their own changes. sqlite3
+    caches compiled statements per SQL string, so callers should reuse
+    constant SQL text.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="roleassign-db")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pending: List[Tuple[List[Statement], asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_lock = asyncio.Lock()
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    # ---- worker-thread side ----
+    def _open(self, schema: Sequence[str]):
+        conn = sqlite3.connect(self.path, isolation_level=None, cached_statements=64)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        for ddl in schema:
+            conn.execute(ddl)
+        self._conn = conn
+
+    def _apply(self, units: List[List[Statement]]) -> List[object]:
+        """Commit all *units* in one transaction; on failure retry each alone."""
+        conn = self._conn
+        try:
+            conn.execute("BEGIN")
+            for unit in units:
+                for sql, params in unit:
+                    conn.execute(sql, params)
+            conn.execute("COMMIT")
+            return [None] * len(units)
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            if len(units) == 1:
+                raise
+        results: List[object] = []
+        for unit in units:
+            try:
+                results.append(self._apply([unit])[0])
+            except sqlite3.Error as exc:
+                results.append(exc)
+        return results
+
+    def _query(self, sql: str, params: Sequence, one: bool):
+        cur = self._conn.execute(sql, params)
+        return cur.fetchone() if one else cur.fetchall()
+
+    def _close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # ---- event-loop side ----
+    async def start(self, schema: Sequence[str]):
+        await self._run(self._open, schema)
+
+    async def write(self, sql: str, params: Sequence = ()):
+        await self.write_many([(sql, params)])
+
+    async def write_many(self, statements: List[Statement]):
+        """Queue *statements* to commit atomically, together with any other pending writes."""
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((list(statements), fut))
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(
+                WRITE_COALESCE_SECONDS, lambda: asyncio.ensure_future(self.flush())
+            )
+        await fut
+
+    async def flush(self):
+        async with self._flush_lock:
+            if self._flush_handle is not None:
+                self._flush_handle.cancel()
+                self._flush_handle = None
+            batch, self._pending = self._pending, []
+            if not batch:
+                return
+            try:
+                results = await self._run(self._apply, [unit for unit, _ in batch])
+            except Exception as exc:
+                results = [exc] * len(batch)
+            for (_, fut), result in zip(batch, results):
+                if fut.done():
+                    continue
+                if isinstance(result, Exception):
+                    fut.set_exception(result)
+                else:
+                    fut.set_result(result)
+
+    async def fetchall(self, sql: str, params: Sequence = ()) -> List[sqlite3.Row]:
+        if self._pending:
+            await self.flush()
+        return await self._run(self._query, sql, params, False)
+
+    async def fetchone(self, sql: str, params: Sequence = ()) -> Optional[sqlite3.Row]:
+        if self._pending:
+            await self.flush()
+        return await self._run(self._query, sql, params, True)
+
+    async def close(self):
+        await self.flush()
+        await self._run(self._close)
+        self._executor.shutdown(wait=False)
+
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS role_messages (
+        guild_id TEXT NOT NULL,
+        category TEXT NOT NULL,
+        message_id TEXT NOT NULL,
+        channel_id TEXT,
+        PRIMARY KEY (guild_id, category)
+    )
+    """,
+    # new table for emoji->role mappings
+    """
+    CREATE TABLE IF NOT EXISTS emoji_role_map (
+        guild_id TEXT NOT NULL,
+        message_id TEXT NOT NULL,
+        emoji TEXT NOT NULL,
+        role_id TEXT NOT NULL,
+        PRIMARY KEY (guild_id, message_id, emoji)
+    )
+    """,
+)
+
+SQL_ALL_MESSAGES = "SELECT guild_id, category, message_id FROM role_messages"
+SQL_ALL_MAPPINGS = "SELECT guild_id, message_id, emoji, role_id FROM emoji_role_map"
+SQL_GUILD_MESSAGES = "SELECT category, message_id, channel_id FROM role_messages WHERE guild_id = ?"
+SQL_CATEGORY_MESSAGE = "SELECT message_id, channel_id FROM role_messages WHERE guild_id = ? AND category = ?"
+SQL_SET_MESSAGE = "INSERT OR REPLACE INTO role_messages (guild_id, category, message_id, channel_id) VALUES (?, ?, ?, ?)"
+SQL_MISSING_CHANNELS = "SELECT DISTINCT guild_id, message_id FROM role_messages WHERE channel_id IS NULL"
+# channel_id recorded for a message the backfill searched for and did not find
+CHANNEL_NOT_FOUND = "0"
+SQL_SET_CHANNEL = "UPDATE role_messages SET channel_id = ? WHERE guild_id = ? AND message_id = ?"
+SQL_DELETE_CATEGORY = "DELETE FROM role_messages WHERE guild_id = ? AND category = ?"
+SQL_MESSAGE_CATEGORIES = "SELECT category FROM role_messages WHERE guild_id = ? AND message_id = ?"
+# Drop a message's mappings once no category points at it any more.
+SQL_DELETE_ORPHAN_MAPPINGS = (
+    "DELETE FROM emoji_role_map WHERE guild_id = ? AND message_id = ? AND NOT EXISTS "
+    "(SELECT 1 FROM role_messages WHERE guild_id = ? AND message_id = ?)"
+)
+SQL_MESSAGE_MAPPINGS = "SELECT emoji, role_id FROM emoji_role_map WHERE guild_id = ? AND message_id = ?"
+SQL_SET_MAPPING = "INSERT OR REPLACE INTO emoji_role_map (guild_id, message_id, emoji, role_id) VALUES (?, ?, ?, ?)"
+SQL_DELETE_MAPPING = "DELETE FROM emoji_role_map WHERE guild_id = ? AND message_id = ? AND emoji = ?"
+
+
 class RoleAssignment(commands.Cog):
     """Simple role-assignment cog using emoji reactions and a small sqlite DB."""
 
     def __init__(self, bot):
         self.bot = bot
+        self.members = get_member_resolver(bot)
+        self.rest = get_rest_scheduler(bot)
         # DB lives in data/ under repo root (created if missing)
         base = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
         data_dir = os.path.join(base, "data")
         os.makedirs(data_dir, exist_ok=True)
 
         self.db_path = os.path.join(data_dir, "roleassign.sqlite")
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
-        self._init_db()
+        # All DB access goes through AsyncSQLite; opened in cog_load.
+        self.db = AsyncSQLite(self.db_path)
+        self._backfill_task: Optional[asyncio.Task] = None
+        self._reconcile_task: Optional[asyncio.Task] = None
+
+        # Pending reaction-role changes: {(guild_id, member_id): {role_id: add?}}
+        self._role_changes: Dict[Tuple[int, int], Dict[int, bool]] = {}
+        self._role_flushers: Dict[Tuple[int, int], asyncio.Task] = {}
+        self._role_locks: Dict[Tuple[int, int], asyncio.Lock] = defaultdict(asyncio.Lock)
+        # Our own recent edits per member, {key: (when, {role_id: added?})}, layered on the
+        # cached roles until the gateway's member update for them arrives.
+        self._edited_roles: Dict[Tuple[int, int], Tuple[float, Dict[int, bool]]] = {}
 
         # In-memory cache for quick membership checks:
         # { guild_id: { message_id: category, ... }, ... }
         self.cache = {}
-        # Also keep a flat set for ultra-fast "is this message tracked?"
-        self.tracked_messages = set()
+        # Also keep a flat set of int message IDs for ultra-fast "is this message tracked?"
+        self.tracked_messages: Set[int] = set()
 
         # Emoji->role mapping cache:
         # { guild_id: { message_id: { emoji_str: role_id, ... }, ... }, ... }
         self.emoji_map = {}
-        self._load_cache()
-
-    def _init_db(self):
-        cur = self.conn.cursor()
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS role_messages (
-                guild_id TEXT NOT NULL,
-                category TEXT NOT NULL,
-                message_id TEXT NOT NULL,
-                PRIMARY KEY (guild_id, category)
-            )
-            """
-        )
-
-        # new table for emoji->role mappings
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS emoji_role_map (
-                guild_id TEXT NOT NULL,
-                message_id TEXT NOT NULL,
-                emoji TEXT NOT NULL,
-                role_id TEXT NOT NULL,
-                PRIMARY KEY (guild_id, message_id, emoji)
-            )
-            """
-        )
-        self.conn.commit()
 
-    def _load_cache(self):
+        # Hot-path lookup derived from emoji_map for tracked messages only:
+        # { (message_id, emoji_key): role_id } with role names already resolved.
+        self.reaction_roles: Dict[Tuple[int, EmojiKey], int] = {}
+        self._lookup_keys: Dict[str, Set[Tuple[int, EmojiKey]]] = {}
+        # guilds whose mappings reference roles by name and need a rebuild on role changes
+        self._named_role_guilds: Set[str] = set()
+
+    async def cog_load(self):
+        await self.db.start(SCHEMA)
+        await self._migrate()
+        await self._load_cache()
+        self._backfill_task = asyncio.create_task(self._backfill_channel_ids())
+        self._reconcile_task = asyncio.create_task(self._startup_reconcile())
+
+    async def _migrate(self):
+        """Bring databases created by older versions up to the current schema."""
+        columns = {r["name"] for r in await self.db.fetchall("PRAGMA table_info(role_messages)")}
+        if "channel_id" not in columns:
+            await self.db.write("ALTER TABLE role_messages ADD COLUMN channel_id TEXT")
+
+    async def _locate_message(
+        self,
+        guild: discord.Guild,
+        mid: str,
+        hint: Optional[discord.abc.Messageable] = None,
+        priority: Priority = Priority.NOTICES,
+    ) -> Optional[discord.Message]:
+        """Find message *mid* by trying *hint* first and then every text channel."""
+        channels = [hint] if hint is not None else []
+        channels.extend(ch for ch in guild.text_channels if ch is not hint)
+        for ch in channels:
+            try:
+                return await self.rest.run(priority, ch.fetch_message, int(mid))
+            except (discord.NotFound, discord.Forbidden):
+                continue
+            except Exception:
+                # other HTTP errors - skip this channel
+                continue
+        return None
+
+    async def _backfill_channel_ids(self):
+        """One-time search for the channel of role messages stored before channel_id existed.
+
+        A message that no channel has is marked ``CHANNEL_NOT_FOUND`` so later
+        loads don't search for it again; rolepopulate still retries it.
+        """
+        await self.bot.wait_until_ready()
+        for row in await self.db.fetchall(SQL_MISSING_CHANNELS):
+            guild = self.bot.get_guild(int(row["guild_id"]))
+            if guild is None:
+                continue
+            mid = str(row["message_id"])
+            message = await self._locate_message(guild, mid, priority=Priority.BULK) if mid.isdigit() else None
+            if message is None:
+                log.warning("Role message %s not found in guild %s", mid, guild.id)
+                await self.db.write(SQL_SET_CHANNEL, (CHANNEL_NOT_FOUND, str(guild.id), mid))
+                continue
+            await self.db.write(SQL_SET_CHANNEL, (str(message.channel.id), str(guild.id), mid))
+
+    async def _load_cache(self):
         """Load DB into memory and populate tracked_messages set and emoji_map."""
-        cur = self.conn.execute("SELECT guild_id, category, message_id FROM role_messages")
-        rows = cur.fetchall()
+        rows = await self.db.fetchall(SQL_ALL_MESSAGES)
         self.cache = {}
         self.tracked_messages.clear()
         for r in rows:
             gid = str(r["guild_id"])
             mid = str(r["message_id"])
             cat = str(r["category"])
+            if not mid.isdigit():
+                log.warning("Ignoring role message %r for category %r in guild %s: not a message ID", mid, cat, gid)
+                continue
             self.cache.setdefault(gid, {})[mid] = cat
-            self.tracked_messages.add(mid)
+            self.tracked_messages.add(int(mid))
 
         # load emoji->role mappings
-        cur2 = self.conn.execute("SELECT guild_id, message_id, emoji, role_id FROM emoji_role_map")
-        rows2 = cur2.fetchall()
+        rows2 = await self.db.fetchall(SQL_ALL_MAPPINGS)
         self.emoji_map = {}
         for r in rows2:
             gid = str(r["guild_id"])
@@ -80,6 +333,69 @@ class RoleAssignment(commands.Cog):
             rid = str(r["role_id"])
             self.emoji_map.setdefault(gid, {}).setdefault(mid, {})[emo] = rid
 
+        self.reaction_roles.clear()
+        self._lookup_keys.clear()
+        self._named_role_guilds.clear()
+        for gid in set(self.cache) | set(self.emoji_map):
+            self._rebuild_lookup(gid)
+
+    def _rebuild_lookup(self, gid: str):
+        """Recompute one guild's entries in reaction_roles from cache and emoji_map."""
+        for key in self._lookup_keys.pop(gid, ()):
+            self.reaction_roles.pop(key, None)
+        self._named_role_guilds.discard(gid)
+        guild = self.bot.get_guild(int(gid))
+        names: Optional[Dict[str, int]] = None
+        keys = set()
+        for mid, mappings in self.emoji_map.get(gid, {}).items():
+            if mid not in self.cache.get(gid, {}):
+                continue
+            for emo, rid in mappings.items():
+                if rid.isdigit():
+                    role_id = int(rid)
+                else:
+                    # resolved once per rebuild; refreshed by the role listeners below
+                    self._named_role_guilds.add(gid)
+                    if names is None:
+                        names = {r.name: r.id for r in guild.roles} if guild else {}
+                    role_id = names.get(rid)
+                    if role_id is None:
+                        continue
+                key = (int(mid), _emoji_key(emo))
+                self.reaction_roles[key] = role_id
+                keys.add(key)
+        self._lookup_keys[gid] = keys
+
+    # The helpers below apply the in-memory side of a DB change. Callers run
+    # them straight after the write commits, with no await in between, so the
+    # caches and the DB never disagree and no full reload is needed.
+    def _cache_track(self, gid: str, mid: str, category: str):
+        if not mid.isdigit():
+            return  # legacy row, never tracked (see _load_cache)
+        self.cache.setdefault(gid, {})[mid] = category
+        self.tracked_messages.add(int(mid))
+        self._rebuild_lookup(gid)
+
+    def _cache_untrack(self, gid: str, mid: str, drop_mappings: bool):
+        self.cache.get(gid, {}).pop(mid, None)
+        if mid.isdigit():
+            self.tracked_messages.discard(int(mid))
+        if drop_mappings:
+            self.emoji_map.get(gid, {}).pop(mid, None)
+        self._rebuild_lookup(gid)
+
+    async def _other_categories(self, gid: str, mid: str, category: str) -> List[str]:
+        """Categories other than *category* that point at message *mid* (read before a write)."""
+        rows = await self.db.fetchall(SQL_MESSAGE_CATEGORIES, (gid, mid))
+        return [str(r["category"]) for r in rows if str(r["category"]) != category]
+
+    def _cache_retire(self, gid: str, mid: str, others: List[str], drop_mappings: bool = True):
+        """Stop tracking *mid* unless one of *others* still points at it."""
+        if others:
+            self._cache_track(gid, mid, others[0])
+        else:
+            self._cache_untrack(gid, mid, drop_mappings)
+
     @commands.command()
     @commands.guild_only()
     @commands.has_permissions(manage_roles=True)
@@ -96,17 +412,21 @@ class RoleAssignment(commands.Cog):
         # Delete mapping: roleassign remove <category>
         if category and category.lower() in ("remove", "delete") and message_id:
             cat_to_delete = message_id.lower()
-            self.conn.execute("DELETE FROM role_messages WHERE guild_id = ? AND category = ?", (guild_id, cat_to_delete))
-            self.conn.commit()
-            # refresh caches
-            self._load_cache()
+            row = await self.db.fetchone(SQL_CATEGORY_MESSAGE, (guild_id, cat_to_delete))
+            if not row:
+                return await ctx.send(f"No role-assign message configured for category '{cat_to_delete}'.")
+            old_mid = str(row["message_id"])
+            others = await self._other_categories(guild_id, old_mid, cat_to_delete)
+            await self.db.write_many([
+                (SQL_DELETE_CATEGORY, (guild_id, cat_to_delete)),
+                (SQL_DELETE_ORPHAN_MAPPINGS, (guild_id, old_mid, guild_id, old_mid)),
+            ])
+            self._cache_retire(guild_id, old_mid, others)
             return await ctx.send(f"Removed role-assign mapping for category '{cat_to_delete}'")
 
         # List current mappings when no args
         if category is None:
-            rows = self.conn.execute(
-                "SELECT category, message_id FROM role_messages WHERE guild_id = ?", (guild_id,)
-            ).fetchall()
+            rows = await self.db.fetchall(SQL_GUILD_MESSAGES, (guild_id,))
             if not rows:
                 await ctx.send("No role assignment messages configured for this guild.")
                 return
@@ -119,15 +439,21 @@ class RoleAssignment(commands.Cog):
             return
 
         category = category.lower()
-        self.conn.execute(
-            "INSERT OR REPLACE INTO role_messages (guild_id, category, message_id) VALUES (?, ?, ?)",
-            (guild_id, category, str(message_id)),
-        )
-        self.conn.commit()
-
-        # refresh caches for this guild
-        self._load_cache()
-        await ctx.send(f"Role-assign message for '{category}' set to {message_id}")
+        message_id = str(message_id)
+        if not message_id.isdigit():
+            return await ctx.send(f"'{message_id}' is not a message ID.")
+        row = await self.db.fetchone(SQL_CATEGORY_MESSAGE, (guild_id, category))
+        old_mid = str(row["message_id"]) if row else None
+        others = await self._other_categories(guild_id, old_mid, category) if old_mid else []
+        located = await self._locate_message(ctx.guild, message_id, hint=ctx.channel)
+        channel_id = str(located.channel.id) if located else None
+        await self.db.write(SQL_SET_MESSAGE, (guild_id, category, message_id, channel_id))
+        self._cache_track(guild_id, message_id, category)
+        if old_mid and old_mid != message_id:
+            # the previous message keeps its emoji mappings so rolemigrate can move them
+            self._cache_retire(guild_id, old_mid, others, drop_mappings=False)
+        where = f" in <#{channel_id}>" if channel_id else " (message not found yet)"
+        await ctx.send(f"Role-assign message for '{category}' set to {message_id}{where}")
 
     @commands.command()
     @commands.guild_only()
@@ -149,7 +475,7 @@ class RoleAssignment(commands.Cog):
         if action == "list":
             if category:
                 # find message for category
-                row = self.conn.execute("SELECT message_id FROM role_messages WHERE guild_id = ? AND category = ?", (guild_id, category.lower())).fetchone()
+                row = await self.db.fetchone(SQL_CATEGORY_MESSAGE, (guild_id, category.lower()))
                 if not row:
                     return await ctx.send(f"No role-assign message configured for category '{category}'.")
                 message_id = str(row["message_id"])
@@ -163,7 +489,7 @@ class RoleAssignment(commands.Cog):
                 await ctx.send("Mappings:\n" + "\n".join(lines))
             else:
                 # list all categories and counts
-                rows = self.conn.execute("SELECT category, message_id FROM role_messages WHERE guild_id = ?", (guild_id,)).fetchall()
+                rows = await self.db.fetchall(SQL_GUILD_MESSAGES, (guild_id,))
                 if not rows:
                     return await ctx.send("No role-assign messages configured.")
                 lines = []
@@ -179,33 +505,30 @@ class RoleAssignment(commands.Cog):
             if not category or not emoji or not role:
                 return await ctx.send("Usage: rolemap add <category> <emoji> <@role>")
             # get message id for category
-            row = self.conn.execute("SELECT message_id FROM role_messages WHERE guild_id = ? AND category = ?", (guild_id, category.lower())).fetchone()
+            row = await self.db.fetchone(SQL_CATEGORY_MESSAGE, (guild_id, category.lower()))
             if not row:
                 return await ctx.send("No role-assign message for that category. Set it with roleassign first.")
             message_id = str(row["message_id"])
             emoji_key = emoji  # store emoji exactly as provided (should match str(payload.emoji))
-            self.conn.execute(
-                "INSERT OR REPLACE INTO emoji_role_map (guild_id, message_id, emoji, role_id) VALUES (?, ?, ?, ?)",
-                (guild_id, message_id, emoji_key, str(role.id)),
-            )
-            self.conn.commit()
+            await self.db.write(SQL_SET_MAPPING, (guild_id, message_id, emoji_key, str(role.id)))
             # update in-memory map
             self.emoji_map.setdefault(guild_id, {}).setdefault(message_id, {})[emoji_key] = str(role.id)
+            self._rebuild_lookup(guild_id)
             await ctx.send(f"Mapped {emoji} -> {role.mention} for category {category}")
             return
 
         if action == "remove":
             if not category or not emoji:
                 return await ctx.send("Usage: rolemap remove <category> <emoji>")
-            row = self.conn.execute("SELECT message_id FROM role_messages WHERE guild_id = ? AND category = ?", (guild_id, category.lower())).fetchone()
+            row = await self.db.fetchone(SQL_CATEGORY_MESSAGE, (guild_id, category.lower()))
             if not row:
                 return await ctx.send("No role-assign message for that category.")
             message_id = str(row["message_id"])
             emoji_key = emoji
-            self.conn.execute("DELETE FROM emoji_role_map WHERE guild_id = ? AND message_id = ? AND emoji = ?", (guild_id, message_id, emoji_key))
-            self.conn.commit()
+            await self.db.write(SQL_DELETE_MAPPING, (guild_id, message_id, emoji_key))
             # update cache
             self.emoji_map.get(guild_id, {}).get(message_id, {}).pop(emoji_key, None)
+            self._rebuild_lookup(guild_id)
             await ctx.send(f"Removed mapping for {emoji} in category {category}")
             return
 
@@ -221,76 +544,80 @@ class RoleAssignment(commands.Cog):
         Usage:
           rolepopulate            -> populate all configured messages in this guild
           rolepopulate <category> -> populate only the message for that category
-        The command will attempt to find the message by ID across text channels,
-        then add each mapped emoji as a reaction.
+        Each message is fetched from its stored channel (falling back to a
+        search of all text channels once), then every mapped emoji the bot has
+        not already reacted with is added.
         """
         guild = ctx.guild
         gid = str(guild.id)
 
-        # gather target message IDs
+        # gather target messages as (message_id, channel_id)
         if category:
-            row = self.conn.execute(
-                "SELECT message_id FROM role_messages WHERE guild_id = ? AND category = ?",
-                (gid, category.lower()),
-            ).fetchone()
+            row = await self.db.fetchone(SQL_CATEGORY_MESSAGE, (gid, category.lower()))
             if not row:
                 return await ctx.send(f"No role-assign message configured for category '{category}'.")
-            targets = [str(row["message_id"])]
+            rows = [row]
         else:
-            rows = self.conn.execute(
-                "SELECT message_id FROM role_messages WHERE guild_id = ?", (gid,)
-            ).fetchall()
+            rows = await self.db.fetchall(SQL_GUILD_MESSAGES, (gid,))
             if not rows:
                 return await ctx.send("No role-assign messages configured for this guild.")
-            targets = [str(r["message_id"]) for r in rows]
+        targets = {str(r["message_id"]): r["channel_id"] for r in rows}
 
         await ctx.send(f"Populating {len(targets)} message(s) with mapped emojis...")
 
-        populated = 0
         errors = []
 
-        for mid in targets:
-            mappings = self.emoji_map.get(gid, {}).get(mid, {})
-            if not mappings:
-                # nothing to add for this message
-                continue
-
-            message_obj = None
-            # find message by searching text channels (fetch_message requires channel)
-            for ch in guild.text_channels:
+        async def fetch(mid: str, channel_id: Optional[str]) -> Optional[discord.Message]:
+            channel = guild.get_channel_or_thread(int(channel_id)) if channel_id else None
+            if channel is not None:
                 try:
-                    message_obj = await ch.fetch_message(int(mid))
-                    break
-                except (discord.NotFound, discord.Forbidden):
-                    continue
-                except Exception:
-                    # other HTTP errors - skip this channel
-                    continue
-
-            if not message_obj:
+                    return await channel.fetch_message(int(mid))
+                except discord.HTTPException:
+                    pass
+            message = await self._locate_message(guild, mid, priority=Priority.BULK)
+            if message is not None:
+                await self.db.write(SQL_SET_CHANNEL, (str(message.channel.id), gid, mid))
+            return message
+
+        # fetch all messages concurrently; they live in different buckets
+        wanted = {mid: ch for mid, ch in targets.items() if mid.isdigit() and self.emoji_map.get(gid, {}).get(mid)}
+        fetched = await asyncio.gather(*(fetch(mid, ch) for mid, ch in wanted.items()))
+
+        # group by channel: reactions share a per-channel rate-limit bucket
+        per_channel: Dict[int, List[discord.Message]] = defaultdict(list)
+        for mid, message_obj in zip(wanted, fetched):
+            if message_obj is None:
                 errors.append(f"Message {mid} not found in any accessible text channel.")
-                continue
+            else:
+                per_channel[message_obj.channel.id].append(message_obj)
 
-            # add each emoji as a reaction
-            for emo in mappings.keys():
-                try:
+        added = 0
+
+        async def react_all(messages: List[discord.Message]):
+            nonlocal added
+            for message_obj in messages:
+                present = {str(r.emoji) for r in message_obj.reactions if r.me}
+                for emo in self.emoji_map.get(gid, {}).get(str(message_obj.id), {}):
+                    if emo in present:
+                        continue
                     # parse custom emoji strings into PartialEmoji if necessary
-                    react = None
-                    if isinstance(emo, str) and emo.startswith("<") and ":" in emo:
+                    react = emo
+                    if emo.startswith("<") and ":" in emo:
                         try:
                             react = discord.PartialEmoji.from_str(emo)
                         except Exception:
                             react = emo
-                    else:
-                        react = emo
-                    await message_obj.add_reaction(react)
-                except Exception as e:
-                    # keep going, but record error
-                    errors.append(f"Failed to add {emo} to message {mid}: {e}")
+                    try:
+                        await self._add_reaction_paced(message_obj, react)
+                        added += 1
+                    except Exception as e:
+                        # keep going, but record error
+                        errors.append(f"Failed to add {emo} to message {message_obj.id}: {e}")
 
-            populated += 1
+        await asyncio.gather(*(react_all(msgs) for msgs in per_channel.values()))
+        populated = sum(len(msgs) for msgs in per_channel.values())
 
-        reply_lines = [f"Populated {populated} message(s)."]
+        reply_lines = [f"Populated {populated} message(s) with {added} new reaction(s)."]
         if errors:
             reply_lines.append("Some errors occurred:")
             reply_lines.extend(errors[:10])
@@ -298,6 +625,18 @@ class RoleAssignment(commands.Cog):
                 reply_lines.append(f"...and {len(errors)-10} more errors")
         await ctx.send("\n".join(reply_lines))
 
+    async def _add_reaction_paced(self, message: discord.Message, emoji, attempts: int = 3):
+        """Add a reaction, pacing calls and backing off if Discord still answers 429."""
+        for attempt in range(attempts):
+            try:
+                await self.rest.run(Priority.BULK, message.add_reaction, emoji)
+                await asyncio.sleep(REACTION_INTERVAL_SECONDS)
+                return
+            except discord.HTTPException as e:
+                if e.status != 429 or attempt == attempts - 1:
+                    raise
+                await asyncio.sleep(getattr(e, "retry_after", None) or REACTION_INTERVAL_SECONDS * 2 ** (attempt + 1))
+
     @commands.command()
     @commands.guild_only()
     @commands.has_permissions(manage_roles=True)
@@ -310,103 +649,325 @@ class RoleAssignment(commands.Cog):
         """
         guild_id = str(ctx.guild.id)
 
-        def resolve(arg: str):
+        async def resolve(arg: str):
             # if numeric assume message id, otherwise treat as category and look up its message_id
             if arg.isdigit():
                 return arg
-            row = self.conn.execute("SELECT message_id FROM role_messages WHERE guild_id = ? AND category = ?", (guild_id, arg.lower())).fetchone()
+            row = await self.db.fetchone(SQL_CATEGORY_MESSAGE, (guild_id, arg.lower()))
             return str(row["message_id"]) if row else None
 
-        src_mid = resolve(source)
-        dst_mid = resolve(dest)
+        src_mid = await resolve(source)
+        dst_mid = await resolve(dest)
         if not src_mid:
             return await ctx.send(f"Source '{source}' not found (not a message id and no category).")
         if not dst_mid:
             return await ctx.send(f"Destination '{dest}' not found (not a message id and no category).")
 
         # copy rows from src to dst (skip duplicates)
-        rows = self.conn.execute("SELECT emoji, role_id FROM emoji_role_map WHERE guild_id = ? AND message_id = ?", (guild_id, src_mid)).fetchall()
+        rows = await self.db.fetchall(SQL_MESSAGE_MAPPINGS, (guild_id, src_mid))
         if not rows:
             return await ctx.send("No mappings found for source message.")
-        inserted = 0
+        # insert or replace for destination, all in one transaction
+        await self.db.write_many([
+            (SQL_SET_MAPPING, (guild_id, dst_mid, str(r["emoji"]), str(r["role_id"])))
+            for r in rows
+        ])
+        inserted = len(rows)
+        # apply the same rows to the cache
+        dst_map = self.emoji_map.setdefault(guild_id, {}).setdefault(dst_mid, {})
         for r in rows:
-            emo = str(r["emoji"])
-            rid = str(r["role_id"])
-            # insert or replace for destination
-            self.conn.execute("INSERT OR REPLACE INTO emoji_role_map (guild_id, message_id, emoji, role_id) VALUES (?, ?, ?, ?)", (guild_id, dst_mid, emo, rid))
-            inserted += 1
-        self.conn.commit()
-        # reload cache
-        self._load_cache()
+            dst_map[str(r["emoji"])] = str(r["role_id"])
+        self._rebuild_lookup(guild_id)
         await ctx.send(f"Migrated {inserted} mapping(s) from {src_mid} to {dst_mid}.")
 
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
-        # fast-filter: skip if message_id not tracked
-        if payload.message_id is None or str(payload.message_id) not in self.tracked_messages:
+        # fast-filter: one int set lookup rejects every untracked message
+        if payload.message_id not in self.tracked_messages:
             return
-        # ignore bots and DMs
-        if payload.user_id is None or payload.guild_id is None:
+        # ignore DMs and our own reactions
+        if payload.guild_id is None or payload.user_id == self.bot.user.id:
             return
-        if payload.user_id == self.bot.user.id:
+        role_id = self.reaction_roles.get((payload.message_id, payload.emoji.id or payload.emoji.name))
+        if role_id is None:
             return
 
-        gid = str(payload.guild_id)
-        mid = str(payload.message_id)
-        emoji_key = str(payload.emoji)
-
-        role_id = self.emoji_map.get(gid, {}).get(mid, {}).get(emoji_key)
-        if not role_id:
-            return
-
-        guild = self.bot.get_guild(payload.guild_id)
-        if not guild:
-            return
-        member = guild.get_member(payload.user_id)
+        member = payload.member
+        if member is None:
+            guild = self.bot.get_guild(payload.guild_id)
+            member = await self.members.resolve(guild, payload.user_id) if guild else None
         if not member or member.bot:
             return
-
-        # resolve role
-        target_role = guild.get_role(int(role_id)) if role_id.isdigit() else next((r for r in guild.roles if r.name == role_id), None)
-        if target_role:
-            try:
-                await member.add_roles(target_role, reason="Role assignment via reaction")
-            except Exception:
-                pass
+        self._queue_role_change(payload.guild_id, member.id, role_id, True)
 
     @commands.Cog.listener()
     async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
-        if payload.message_id is None or str(payload.message_id) not in self.tracked_messages:
+        if payload.message_id not in self.tracked_messages:
             return
-        if payload.user_id is None or payload.guild_id is None:
+        if payload.guild_id is None:
             return
-
-        gid = str(payload.guild_id)
-        mid = str(payload.message_id)
-        emoji_key = str(payload.emoji)
-        role_id = self.emoji_map.get(gid, {}).get(mid, {}).get(emoji_key)
-        if not role_id:
+        role_id = self.reaction_roles.get((payload.message_id, payload.emoji.id or payload.emoji.name))
+        if role_id is None:
             return
 
         guild = self.bot.get_guild(payload.guild_id)
         if not guild:
             return
-        member = guild.get_member(payload.user_id)
+        # remove events carry no member, and the gateway cache may not hold them
+        member = await self.members.resolve(guild, payload.user_id)
         if not member or member.bot:
             return
+        self._queue_role_change(guild.id, member.id, role_id, False)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        if before.name != after.name and str(after.guild.id) in self._named_role_guilds:
+            self._rebuild_lookup(str(after.guild.id))
+
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role: discord.Role):
+        if str(role.guild.id) in self._named_role_guilds:
+            self._rebuild_lookup(str(role.guild.id))
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        if str(role.guild.id) in self._named_role_guilds:
+            self._rebuild_lookup(str(role.guild.id))
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        # the cache is current again, including any roles a moderator changed meanwhile
+        if before.roles != after.roles:
+            self._edited_roles.pop((after.guild.id, after.id), None)
+
+    # -----------------------------------------------------
+    # Coalesced role updates
+    # -----------------------------------------------------
+    def _queue_role_change(self, guild_id: int, member_id: int, role_id: int, add: bool):
+        """Record a reaction's role change; the last change per role wins when flushed."""
+        key = (guild_id, member_id)
+        self._role_changes.setdefault(key, {})[role_id] = add
+        if key not in self._role_flushers:
+            self._role_flushers[key] = asyncio.create_task(self._flush_role_changes(key))
+
+    async def _flush_role_changes(self, key: Tuple[int, int], delay: float = ROLE_COALESCE_SECONDS):
+        await asyncio.sleep(delay)
+        # events arriving from here on start a new window
+        self._role_flushers.pop(key, None)
+        changes = self._role_changes.pop(key, None)
+        if changes:
+            await self._apply_role_changes(key, changes)
+
+    async def _apply_role_changes(self, key: Tuple[int, int], changes: Dict[int, bool]):
+        """Apply the net role diff for one member with a single edit, retrying HTTP errors."""
+        async with self._role_locks[key]:
+            await self._apply_role_changes_locked(key, changes)
+        if not self._role_locks[key].locked() and key not in self._role_flushers:
+            self._role_locks.pop(key, None)
+
+    async def _apply_role_changes_locked(self, key: Tuple[int, int], changes: Dict[int, bool]):
+        guild = self.bot.get_guild(key[0])
+        for attempt in range(1, ROLE_EDIT_ATTEMPTS + 1):
+            member = await self.members.resolve(guild, key[1], fresh=True) if guild else None
+            if member is None:
+                log.warning("Dropping role changes for %s in guild %s: member not found", key[1], key[0])
+                return
+            role_ids = [r.id for r in member.roles if not r.is_default()]
+            edited = self._edited_roles.get(key)
+            recent: Dict[int, bool] = {}
+            if edited and time.monotonic() - edited[0] < ROLE_EDIT_MEMORY_SECONDS:
+                # the cache may not show our last edit yet; never roll back anyone else's changes
+                recent = edited[1]
+                role_ids = [rid for rid in role_ids if recent.get(rid, True)]
+                role_ids += [rid for rid, add in recent.items() if add and rid not in role_ids]
+            current = set(role_ids)
+            to_add = [rid for rid, add in changes.items() if add and rid not in current and guild.get_role(rid)]
+            to_remove = {rid for rid, add in changes.items() if not add and rid in current}
+            if not to_add and not to_remove:
+                return
+            new_ids = [rid for rid in role_ids if rid not in to_remove] + to_add
+            try:
+                await self.rest.run(
+                    Priority.ROLES,
+                    member.edit,
+                    roles=[discord.Object(id=rid) for rid in new_ids],
+                    reason="Role assignment via reaction",
+                )
+                now = time.monotonic()
+                recent.update({rid: True for rid in to_add})
+                recent.update({rid: False for rid in to_remove})
+                self._edited_roles[key] = (now, recent)
+                if len(self._edited_roles) > 1000:
+                    self._edited_roles = {
+                        k: v for k, v in self._edited_roles.items() if now - v[0] < ROLE_EDIT_MEMORY_SECONDS
+                    }
+                return
+            except discord.Forbidden:
+                log.error("Missing permissions to update roles of %s in guild %s", member.id, guild.id)
+                return
+            except discord.HTTPException as e:
+                log.warning(
+                    "Role update for %s failed (attempt %d/%d): %s", member.id, attempt, ROLE_EDIT_ATTEMPTS, e
+                )
+                if attempt < ROLE_EDIT_ATTEMPTS:
+                    await asyncio.sleep(2 ** attempt)
+        log.error("Giving up on role update for %s in guild %s: %s", key[1], key[0], changes)
+
+    # -----------------------------------------------------
+    # Reconciliation of reactions missed while offline
+    # -----------------------------------------------------
+    @staticmethod
+    def _resolve_role(guild: discord.Guild, role_id: str) -> Optional[discord.Role]:
+        return guild.get_role(int(role_id)) if role_id.isdigit() else next((r for r in guild.roles if r.name == role_id), None)
+
+    async def _startup_reconcile(self):
+        await self.bot.wait_until_ready()
+        # role names can only be resolved once guilds are available
+        for gid in list(self._named_role_guilds):
+            self._rebuild_lookup(gid)
+        for gid in list(self.emoji_map):
+            guild = self.bot.get_guild(int(gid))
+            if guild is None:
+                continue
+            try:
+                grants, revokes, skipped, elapsed = await self._reconcile_guild(guild)
+            except Exception:
+                log.exception("Reaction-role reconciliation failed for guild %s", gid)
+                continue
+            log.info(
+                "Reaction-role reconciliation for guild %s: %d grant(s), %d revocation(s), "
+                "%d role(s) left alone in %.1fs",
+                gid, grants, revokes, skipped, elapsed,
+            )
 
-        target_role = guild.get_role(int(role_id)) if role_id.isdigit() else next((r for r in guild.roles if r.name == role_id), None)
-        if target_role:
+    async def _reconcile_worker(self, queue: asyncio.Queue):
+        while True:
+            key, changes = await queue.get()
             try:
-                await member.remove_roles(target_role, reason="Role removed via reaction")
+                await self._apply_role_changes(key, changes)
             except Exception:
-                pass
+                log.exception("Reconciliation edit for %s failed", key)
+            finally:
+                queue.task_done()
+            await asyncio.sleep(RECONCILE_EDIT_INTERVAL)
+
+    async def _reconcile_guild(
+        self, guild: discord.Guild, max_revoke_share: float = RECONCILE_MAX_REVOKE_SHARE
+    ) -> Tuple[int, int, int, float]:
+        """Compare reactors with role holders, one role at a time, and queue the differences.
+
+        Only one role's reactor IDs are held in memory at once. Revocations
+        are skipped for a role if any of its messages could not be read or
+        lacks the emoji's reaction altogether (cleared, or not populated yet),
+        and when they would strip more than *max_revoke_share* of its holders.
+        Returns grants, revocations, roles whose revocations were skipped, and seconds taken.
+        """
+        started = time.monotonic()
+        gid = str(guild.id)
+        channels = {str(r["message_id"]): r["channel_id"] for r in await self.db.fetchall(SQL_GUILD_MESSAGES, (gid,))}
+
+        # role_id -> [(message_id, emoji)]: a role may be granted from several messages
+        sources: Dict[int, List[Tuple[str, str]]] = defaultdict(list)
+        for mid, mappings in self.emoji_map.get(gid, {}).items():
+            # legacy non-numeric rows were skipped (and logged) by _load_cache
+            if mid not in self.cache.get(gid, {}):
+                continue
+            for emo, rid in mappings.items():
+                role = self._resolve_role(guild, rid)
+                if role is not None:
+                    sources[role.id].append((mid, emo))
+
+        messages: Dict[str, Optional[discord.Message]] = {}
 
-    def cog_unload(self):
+        async def get_message(mid: str) -> Optional[discord.Message]:
+            if mid not in messages:
+                channel_id = channels.get(mid)
+                channel = guild.get_channel_or_thread(int(channel_id)) if channel_id else None
+                try:
+                    messages[mid] = await channel.fetch_message(int(mid)) if channel else None
+                except discord.HTTPException:
+                    messages[mid] = None
+            return messages[mid]
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=RECONCILE_QUEUE_SIZE)
+        workers = [asyncio.create_task(self._reconcile_worker(queue)) for _ in range(RECONCILE_WORKERS)]
+        grants = revokes = skipped = 0
+        try:
+            for role_id, role_sources in sources.items():
+                role = guild.get_role(role_id)
+                reactors = set()
+                complete = True
+                for mid, emo in role_sources:
+                    message = await get_message(mid)
+                    if message is None:
+                        complete = False
+                        continue
+                    reaction = next((r for r in message.reactions if str(r.emoji) == emo), None)
+                    if reaction is None:
+                        # even the bot's own reaction is missing: we can't tell who should keep the role
+                        complete = False
+                        continue
+                    async for user in reaction.users(limit=None):
+                        if not user.bot:
+                            reactors.add(user.id)
+
+                resolved = await self.members.resolve_many(guild, reactors)
+                for uid, member in resolved.items():
+                    if member is not None and role not in member.roles:
+                        await queue.put(((guild.id, uid), {role_id: True}))
+                        grants += 1
+                if not complete:
+                    skipped += 1
+                    continue
+                holders = [m for m in role.members if not m.bot]
+                stale = [m for m in holders if m.id not in reactors]
+                if len(stale) > RECONCILE_MIN_CAPPED and len(stale) > max_revoke_share * len(holders):
+                    log.warning(
+                        "Not revoking %s from %d of its %d holder(s) in guild %s; run rolereconcile force if intended",
+                        role.name, len(stale), len(holders), guild.id,
+                    )
+                    skipped += 1
+                    continue
+                for member in stale:
+                    await queue.put(((guild.id, member.id), {role_id: False}))
+                    revokes += 1
+            await queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+        return grants, revokes, skipped, time.monotonic() - started
+
+    @commands.command()
+    @commands.guild_only()
+    @commands.has_permissions(manage_roles=True)
+    async def rolereconcile(self, ctx, force: bool = False):
+        """Re-sync reaction roles with the reactions currently on the role messages.
+
+        Roles that would be revoked from most of their holders are left alone unless `force` is given.
+        """
+        await ctx.send("Reconciling reaction roles...")
+        grants, revokes, skipped, elapsed = await self._reconcile_guild(ctx.guild, 1.0 if force else RECONCILE_MAX_REVOKE_SHARE)
+        reply = f"Reconciled in {elapsed:.1f}s: {grants} role(s) granted, {revokes} revoked."
+        if skipped:
+            reply += f" Revocations skipped for {skipped} role(s) (missing reactions or mass revocation; see the log)."
+        await ctx.send(reply)
+
+    async def cog_unload(self):
+        if self._backfill_task:
+            self._backfill_task.cancel()
+        if self._reconcile_task:
+            self._reconcile_task.cancel()
+        # apply pending reaction changes now rather than dropping them
+        pending, self._role_changes = self._role_changes, {}
+        for task in self._role_flushers.values():
+            task.cancel()
+        self._role_flushers.clear()
+        for key, changes in pending.items():
+            await self._apply_role_changes(key, changes)
         try:
-            self.conn.close()
+            await self.db.close()
         except Exception:
-            pass
+            log.exception("Failed to close role-assignment DB")
 
 def setup(bot):
     bot.add_cog(RoleAssignment(bot))
\ No newline at end of file
@@ -2,6 +2,9 @@ import asyncio
 import discord
 from redbot.core import commands, Config
 
+from .MessageRouter import get_message_router
+from .RestScheduler import Priority, get_rest_scheduler
+
 REMINDER_MESSAGE = (
     "🎶Bleep boop🎶 — Hi {user_mention}!\n\n"
     "Sketch Pad is designed for quick sharing and only accepts a single audio file.\n\n"
@@ -25,6 +28,29 @@ class TalkModerator(commands.Cog):
         # Use Red's Config to store per-guild channel_id (same pattern as YoutubePlaylistListener)
         self.config = Config.get_conf(self, identifier=4072712030, force_registration=True)
         self.config.register_guild(channel_id=None)
+        # {guild_id: channel_id}, mirrored from config so checks never await it
+        self._channel_ids = {}
+        self.router = get_message_router(bot)
+        self.rest = get_rest_scheduler(bot)
+
+    async def cog_load(self):
+        for gid, data in (await self.config.all_guilds()).items():
+            self._set_channel(gid, data.get("channel_id"))
+        self.router.register(
+            "TalkModerator",
+            on_message=self._enforce_audio_only,
+            on_message_edit=self._on_message_edit,
+        )
+
+    def cog_unload(self):
+        self.router.unregister("TalkModerator")
+
+    def _set_channel(self, guild_id: int, channel_id):
+        if channel_id is None:
+            self._channel_ids.pop(guild_id, None)
+        else:
+            self._channel_ids[guild_id] = channel_id
+        self.router.set_channels("TalkModerator", guild_id, [channel_id])
 
     @commands.command()
     @commands.guild_only()
@@ -45,6 +71,7 @@ class TalkModerator(commands.Cog):
             return await ctx.send("No channel configured. Use `setchannel #channel` to set one.")
 
         await self.config.guild(ctx.guild).channel_id.set(channel.id)
+        self._set_channel(ctx.guild.id, channel.id)
         await ctx.send(f"TalkModerator channel set to {channel.mention}")
 
     @commands.command()
@@ -55,6 +82,7 @@ class TalkModerator(commands.Cog):
         ch_id = await self.config.guild(ctx.guild).channel_id()
         if ch_id is not None:
             await self.config.guild(ctx.guild).channel_id.set(None)
+            self._set_channel(ctx.guild.id, None)
             await ctx.send("TalkModerator channel cleared.")
         else:
             await ctx.send("No channel configured.")
@@ -71,7 +99,7 @@ class TalkModerator(commands.Cog):
         if not message.guild:
             return False
 
-        channel_id = await self.config.guild(message.guild).channel_id()
+        channel_id = self._channel_ids.get(message.guild.id)
         if channel_id is None or message.channel.id != channel_id:
             return False
 
@@ -99,7 +127,7 @@ class TalkModerator(commands.Cog):
 
         # Invalid message — delete and send channel reminder
         try:
-            await message.delete()
+            await self.rest.run(Priority.MODERATION, message.delete)
         except Exception:
             pass
 
@@ -108,19 +136,15 @@ class TalkModerator(commands.Cog):
         )
 
         try:
-            reminder_msg = await message.channel.send(f"{reminder}")
+            reminder_msg = await self.rest.run(Priority.NOTICES, message.channel.send, f"{reminder}")
             # Delete the reminder after 20 seconds
             await asyncio.sleep(20)
-            await reminder_msg.delete()
+            await self.rest.run(Priority.NOTICES, reminder_msg.delete)
         except Exception:
             pass
 
         return True
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        await self._enforce_audio_only(message)
-
-    @commands.Cog.listener()
-    async def on_message_edit(self, before: discord.Message, after: discord.Message):
+    # Listeners are routed through MessageRouter; see cog_load.
+    async def _on_message_edit(self, before: discord.Message, after: discord.Message):
         await self._enforce_audio_only(after)
@@ -4,34 +4,149 @@ Youtube Seasonal Playlist Cog for Red-DiscordBot
 
 Required deps (inside `/data/venv`):
     !pip install --upgrade google-auth-oauthlib google-api-python-client google-auth
+
+The Google client libraries take seconds to import, so they are only loaded
+the first time the cog actually needs the API (see `_ensure_service`). Loading
+or reloading the PMPAdmin package never touches them.
 """
 from __future__ import annotations
 
 import asyncio
+import json
 import logging
 import os
+import random
 import re
-from datetime import datetime
-from typing import Dict, Optional
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
 
 import discord
+from discord.ext import tasks
 from redbot.core import checks, commands, Config
+from redbot.core.utils.menus import DEFAULT_CONTROLS, menu
+
+from .MessageRouter import get_message_router
+from .Metrics import METRICS
+from .RestScheduler import Priority, get_rest_scheduler
 
-# YouTube API imports
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+if TYPE_CHECKING:
+    import google_auth_httplib2
+    from google.oauth2.credentials import Credentials
+    from googleapiclient.errors import HttpError
 
 log = logging.getLogger("red.youtubeplaylist")
 log.setLevel(logging.INFO)
 log.propagate = True
 
-YOUTUBE_LINK_REGEX = re.compile(
-    r"(?:https?://)?(?:www\.)?(?:youtube\.com/(?:watch\?(?:.*&)?v=|embed/)|youtu\.be/)(?P<id>[A-Za-z0-9_-]{11})",
+# Music link extractors: (platform, pattern, canonical-ID builder). All
+# patterns are joined into MUSIC_LINK_REGEX so each message is scanned once no
+# matter how many platforms are supported. YouTube IDs stay unprefixed so they
+# match the IDs already stored in the video index.
+_EXTRACTORS = (
+    (
+        "youtube",
+        r"(?:https?://)?(?:www\.|m\.|music\.)?(?:youtube\.com/(?:watch\?(?:\S*?&)?v=|embed/|shorts/|live/)|youtu\.be/)"
+        r"(?P<youtube_id>[A-Za-z0-9_-]{11})",
+        lambda m: m["youtube_id"],
+    ),
+    (
+        "spotify",
+        r"https?://open\.spotify\.com/(?:intl-[a-z-]+/)?(?P<spotify_kind>track|album|playlist|episode)/"
+        r"(?P<spotify_id>[A-Za-z0-9]{22})",
+        lambda m: f"spotify:{m['spotify_kind'].lower()}:{m['spotify_id']}",
+    ),
+    (
+        "soundcloud",
+        r"https?://(?:www\.|m\.)?soundcloud\.com/(?P<soundcloud_path>[\w-]+/(?:sets/)?[\w-]+)",
+        lambda m: f"soundcloud:{m['soundcloud_path'].lower()}",
+    ),
+    (
+        "bandcamp",
+        r"https?://(?P<bandcamp_artist>[\w-]+)\.bandcamp\.com/(?P<bandcamp_kind>track|album)/(?P<bandcamp_slug>[\w-]+)",
+        lambda m: f"bandcamp:{m['bandcamp_artist']}/{m['bandcamp_kind']}/{m['bandcamp_slug']}".lower(),
+    ),
+)
+MUSIC_LINK_REGEX = re.compile(
+    "|".join(f"(?P<{platform}>{pattern})" for platform, pattern, _ in _EXTRACTORS),
     flags=re.IGNORECASE,
 )
+_CANONICALIZERS = {platform: canon for platform, _, canon in _EXTRACTORS}
+
+
+def _extract_links(content: str) -> List[Tuple[str, str, str]]:
+    """Return ``(platform, canonical_id, url)`` for each music link in *content*, deduplicated."""
+    links: Dict[str, Tuple[str, str, str]] = {}
+    for m in MUSIC_LINK_REGEX.finditer(content):
+        platform = m.lastgroup
+        cid = _CANONICALIZERS[platform](m)
+        links.setdefault(cid, (platform, cid, m.group(0)))
+    return list(links.values())
+
+
+DATA_DIR = "data/YoutubePlaylistCog"
+# Links from platforms without a playlist sink are appended here.
+LINK_LOG_PATH = os.path.join(DATA_DIR, "collected_links.jsonl")
+
+# Contributor counters are written back to Config at most this often.
+CONTRIBUTOR_FLUSH_SECONDS = 60
+# Redundant records tolerated in a video index log before it is rewritten.
+INDEX_COMPACT_SLACK = 500
+
+# Seconds between attempts to build the API client after a failure.
+SERVICE_RETRY_SECONDS = 300
+
+# Threads dedicated to blocking googleapiclient calls.
+YT_API_THREADS = 4
+YT_API_HTTP_TIMEOUT = 30
+
+# Insert worker tuning
+INSERT_BATCH_SIZE = 50
+RETRY_BASE_SECONDS = 2
+RETRY_MAX_SECONDS = 3600
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+RETRYABLE_REASONS = {"quotaExceeded", "rateLimitExceeded", "userRateLimitExceeded", "backendError"}
+
+# YouTube Data API quota. The daily allowance resets at midnight Pacific time.
+LA_TZ = ZoneInfo("America/Los_Angeles")
+DAILY_QUOTA = 10_000
+# Units backfill jobs may never touch, so live posts can always be inserted.
+LIVE_QUOTA_RESERVE = 2_000
+QUOTA_COSTS = {
+    "playlists.insert": 50,
+    "playlistItems.insert": 50,
+    "playlistItems.list": 1,
+    "playlistItems.delete": 50,
+    "playlists.list": 1,
+    "videos.list": 1,
+}
+# videos.list pre-check: one 1-unit call validates up to 50 IDs.
+VIDEO_CHECK_BATCH = 50
+VIDEO_CACHE_TTL_AVAILABLE = 7 * 24 * 3600
+VIDEO_CACHE_TTL_UNAVAILABLE = 24 * 3600
+VIDEO_CACHE_MAX = 20_000
+
+# scrapeall backfill
+SCRAPE_BATCH_MESSAGES = 200
+SCRAPE_READ_AHEAD = 500
+SCRAPE_PROGRESS_SECONDS = 15
+
+# Next season's playlist is created this long before the season starts.
+PLAYLIST_PRECREATE_DAYS = 7
+PLAYLIST_PRECREATE_CHECK_HOURS = 12
+
+# Titles produced by _season_year, used to re-adopt playlists after a reset.
+SEASON_TITLE_REGEX = re.compile(r"^(?:Winter|Spring|Summer|Fall) \d{4} - What Are You Listening To\?$")
+PAGE_SIZE = 50
+# Leaderboard rows per embed page.
+LEADERBOARD_PAGE_ROWS = 20
+
+PRIORITY_LIVE = "live"
+PRIORITY_BACKFILL = "backfill"
 
 _SEASONS = {
     "Winter": (12, 1, 2),
@@ -41,8 +156,429 @@ _SEASONS = {
 }
 
 
+class _VideoIndex:
+    """In-memory set of collected link IDs backed by an append-only log.
+
+    YouTube videos are stored by bare video ID, links from other platforms by
+    their canonical ``platform:…`` ID (see ``_extract_links``).
+
+    Each log line is ``+<video_id>`` or ``-<video_id>``; replaying the file
+    rebuilds the set. Membership checks never touch disk, and recording a new
+    video appends a single line instead of rewriting the whole history.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.ids: Set[str] = set()
+        self._records = 0
+        self._fp = None
+        # records appended while a compaction is writing its snapshot
+        self._compacting: Optional[List[str]] = None
+        # bumped by clear() so an in-flight compaction drops its stale snapshot
+        self._epoch = 0
+
+    def load(self, seed: Iterable[str] = ()) -> None:
+        """Replay the log, merge *seed* (legacy Config list) and open for append."""
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as fp:
+                for line in fp:
+                    line = line.strip()
+                    if len(line) < 2:
+                        continue
+                    self._records += 1
+                    if line[0] == "+":
+                        self.ids.add(line[1:])
+                    elif line[0] == "-":
+                        self.ids.discard(line[1:])
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._fp = open(self.path, "a", encoding="utf-8")
+        for vid in seed:
+            self.add(vid)
+
+    def __contains__(self, vid: str) -> bool:
+        return vid in self.ids
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _append(self, op: str, vid: str) -> None:
+        self._fp.write(f"{op}{vid}\n")
+        self._fp.flush()
+        self._records += 1
+        if self._compacting is not None:
+            self._compacting.append(f"{op}{vid}\n")
+
+    def add(self, vid: str) -> bool:
+        """Record *vid*; return False if it was already present."""
+        if vid in self.ids:
+            return False
+        self.ids.add(vid)
+        self._append("+", vid)
+        return True
+
+    def discard(self, vid: str) -> bool:
+        if vid not in self.ids:
+            return False
+        self.ids.discard(vid)
+        self._append("-", vid)
+        return True
+
+    def clear(self) -> None:
+        """Forget every ID and truncate the log."""
+        self.ids.clear()
+        self._epoch += 1
+        if self._compacting is not None:
+            self._compacting.clear()
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = open(self.path, "w", encoding="utf-8")
+        self._records = 0
+
+    def needs_compaction(self) -> bool:
+        return self._records - len(self.ids) > INDEX_COMPACT_SLACK
+
+    async def compact(self) -> None:
+        """Rewrite the log so it holds exactly one ``+`` record per live ID.
+
+        Call from the event loop: the snapshot is taken and the file swapped
+        here, only the write happens in a worker thread. Records appended in
+        between are replayed onto the new file.
+        """
+        if self._compacting is not None:
+            return
+        ids = list(self.ids)
+        epoch = self._epoch
+        self._compacting = []
+        try:
+            tmp_path = await asyncio.to_thread(self._write_snapshot, ids)
+        except BaseException:
+            self._compacting = None
+            raise
+        replay, self._compacting = self._compacting, None
+        if self._fp is None or epoch != self._epoch:
+            # closed (cog unloading) or cleared while writing; the current log is complete
+            os.remove(tmp_path)
+            return
+        self._fp.close()
+        os.replace(tmp_path, self.path)
+        self._fp = open(self.path, "a", encoding="utf-8")
+        self._fp.writelines(replay)
+        self._fp.flush()
+        self._records = len(ids) + len(replay)
+
+    def _write_snapshot(self, ids: List[str]) -> str:
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fp:
+            fp.writelines(f"+{vid}\n" for vid in ids)
+        return tmp_path
+
+    def close(self) -> None:
+        if self._fp:
+            self._fp.close()
+            self._fp = None
+
+
+class _Leaderboard:
+    """Contribution counts with a ranking kept sorted as counts grow.
+
+    Counts only ever increase, so an update just bubbles the user up past
+    the entries it overtook – no full sort when the board is read.
+    """
+
+    def __init__(self, counts: Optional[Dict[str, int]] = None):
+        self.counts: Dict[str, int] = {}
+        self.order: List[str] = []
+        self._pos: Dict[str, int] = {}
+        self.total = 0
+        for uid, n in sorted((counts or {}).items(), key=lambda kv: kv[1], reverse=True):
+            self._pos[uid] = len(self.order)
+            self.order.append(uid)
+            self.counts[uid] = n
+            self.total += n
+
+    def add(self, uid: str, n: int = 1) -> None:
+        if uid not in self.counts:
+            self.counts[uid] = 0
+            self._pos[uid] = len(self.order)
+            self.order.append(uid)
+        self.counts[uid] += n
+        self.total += n
+        i = self._pos[uid]
+        while i > 0 and self.counts[self.order[i - 1]] < self.counts[uid]:
+            prev = self.order[i - 1]
+            self.order[i] = prev
+            self._pos[prev] = i
+            i -= 1
+        self.order[i] = uid
+        self._pos[uid] = i
+
+    def top(self, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        return [(uid, self.counts[uid]) for uid in self.order[:limit]]
+
+
+class _ContributionStats:
+    """All-time and per-season leaderboards for one guild."""
+
+    def __init__(self, all_time: Dict[str, int], seasons: Dict[str, Dict[str, int]]):
+        self.all_time = _Leaderboard(all_time)
+        self.seasons: Dict[str, _Leaderboard] = {s: _Leaderboard(c) for s, c in seasons.items()}
+
+    def add(self, season: str, uid: str, n: int = 1) -> None:
+        self.all_time.add(uid, n)
+        self.seasons.setdefault(season, _Leaderboard()).add(uid, n)
+
+    def season_counts(self) -> Dict[str, Dict[str, int]]:
+        return {s: dict(board.counts) for s, board in self.seasons.items()}
+
+
+def _season_label(season_year: str) -> str:
+    """``"Fall 2025 - What Are You Listening To?"`` -> ``"Fall 2025"``."""
+    return season_year.split(" - ", 1)[0]
+
+
+class _LinkLog:
+    """Append-only JSONL sink for links from platforms without an API integration."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fp = None
+
+    def write(self, records: List[dict]) -> None:
+        if self._fp is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._fp = open(self.path, "a", encoding="utf-8")
+        self._fp.writelines(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+        self._fp.flush()
+
+    def close(self) -> None:
+        if self._fp:
+            self._fp.close()
+            self._fp = None
+
+
+class _InsertQueue:
+    """FIFO of pending playlist inserts, persisted as JSON across restarts.
+
+    A job is a dict with ``guild_id``, ``channel_id``, ``message_id``,
+    ``author_id``, ``video_id``, ``season``, ``attempts`` and ``not_before``.
+
+    Saves are coalesced: a single writer task snapshots the latest jobs on the
+    loop and writes them in a thread, so an older snapshot can never replace a
+    newer one, and callers arriving mid-write share the next write.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.jobs: List[dict] = []
+        # bumped by every persist(); the writer loops until it has saved the latest
+        self._generation = 0
+        self._saved_generation = 0
+        self._writer: Optional[asyncio.Task] = None
+
+    def load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as fp:
+                self.jobs = json.load(fp)
+        except (OSError, ValueError) as exc:
+            log.warning("Ignoring unreadable insert queue %s (%s)", self.path, exc)
+            self.jobs = []
+
+    async def persist(self) -> None:
+        """Return once the jobs as they are now have been written to disk."""
+        self._generation += 1
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._write_latest())
+        # a cancelled caller must not abort a write other callers are waiting on
+        await asyncio.shield(self._writer)
+
+    async def _write_latest(self) -> None:
+        try:
+            while self._saved_generation < self._generation:
+                generation = self._generation
+                # copy the dicts too: a retry rewrites attempts and not_before in place
+                await asyncio.to_thread(self._save, [dict(job) for job in self.jobs])
+                self._saved_generation = generation
+        finally:
+            self._writer = None
+
+    def _save(self, jobs: List[dict]) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fp:
+            json.dump(jobs, fp)
+        os.replace(tmp_path, self.path)
+
+
+class _QuotaLedger:
+    """Per-day YouTube quota spend by operation, persisted as JSON.
+
+    The ledger acts as a token bucket that refills to ``DAILY_QUOTA`` at each
+    Pacific midnight. Backfill work may only spend down to the live reserve,
+    so a large scrape is spread over several days instead of starving new posts.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.day = self._today()
+        self.spent: Dict[str, int] = {}
+        self.dirty = False
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(LA_TZ).date().isoformat()
+
+    @staticmethod
+    def next_reset() -> float:
+        """Unix timestamp of the next Pacific midnight."""
+        tomorrow = datetime.now(LA_TZ).date() + timedelta(days=1)
+        return datetime(tomorrow.year, tomorrow.month, tomorrow.day, tzinfo=LA_TZ).timestamp()
+
+    def _roll(self) -> None:
+        today = self._today()
+        if today != self.day:
+            self.day = today
+            self.spent = {}
+            self.dirty = True
+
+    def load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as fp:
+                data = json.load(fp)
+        except (OSError, ValueError) as exc:
+            log.warning("Ignoring unreadable quota ledger %s (%s)", self.path, exc)
+            return
+        self.day = data.get("day", self.day)
+        self.spent = data.get("spent", {})
+        self._roll()
+
+    def snapshot(self) -> dict:
+        """Copy the ledger for ``save`` and mark it clean. Call from the event loop."""
+        self.dirty = False
+        return {"day": self.day, "spent": dict(self.spent)}
+
+    def save(self, data: dict) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fp:
+            json.dump(data, fp)
+        os.replace(tmp_path, self.path)
+
+    @property
+    def total(self) -> int:
+        self._roll()
+        return sum(self.spent.values())
+
+    def remaining(self, priority: str = PRIORITY_LIVE) -> int:
+        limit = DAILY_QUOTA if priority == PRIORITY_LIVE else DAILY_QUOTA - LIVE_QUOTA_RESERVE
+        return max(0, limit - self.total)
+
+    def can_spend(self, cost: int, priority: str = PRIORITY_LIVE) -> bool:
+        return cost <= self.remaining(priority)
+
+    def charge(self, op: str, units: Optional[int] = None) -> None:
+        self._roll()
+        self.spent[op] = self.spent.get(op, 0) + (QUOTA_COSTS.get(op, 1) if units is None else units)
+        self.dirty = True
+
+    def exhaust(self) -> None:
+        """Google says the quota is gone; make the ledger agree until the reset."""
+        short = DAILY_QUOTA - self.total
+        if short > 0:
+            self.charge("external", short)
+
+
+class _VideoStatusCache:
+    """TTL cache of ``videos.list`` results: video_id -> (available, embeddable)."""
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[bool, bool, float]] = {}
+
+    def get(self, vid: str) -> Optional[Tuple[bool, bool]]:
+        entry = self._entries.get(vid)
+        if entry is None:
+            return None
+        if entry[2] < time.monotonic():
+            del self._entries[vid]
+            return None
+        return entry[0], entry[1]
+
+    def put(self, vid: str, available: bool, embeddable: bool) -> None:
+        if len(self._entries) >= VIDEO_CACHE_MAX:
+            now = time.monotonic()
+            self._entries = {k: v for k, v in self._entries.items() if v[2] >= now}
+            if len(self._entries) >= VIDEO_CACHE_MAX:
+                self._entries.clear()
+        ttl = VIDEO_CACHE_TTL_AVAILABLE if available else VIDEO_CACHE_TTL_UNAVAILABLE
+        self._entries[vid] = (available, embeddable, time.monotonic() + ttl)
+
+
+class _ApiMetrics:
+    """Queue depth and latency of calls made on the YouTube API thread pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.wait_times: deque = deque(maxlen=500)
+        self.latencies: deque = deque(maxlen=500)
+
+    def submitted(self) -> None:
+        with self._lock:
+            self.queued += 1
+
+    def started(self, waited: float) -> None:
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+            self.wait_times.append(waited)
+
+    def finished(self, op: str, elapsed: float, ok: bool) -> None:
+        with self._lock:
+            self.running -= 1
+            self.calls[op] += 1
+            if not ok:
+                self.errors[op] += 1
+            self.latencies.append(elapsed)
+
+    @staticmethod
+    def percentile(samples: Iterable[float], pct: float) -> float:
+        ordered = sorted(samples)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _http_error() -> type:
+    """Return googleapiclient's HttpError, importing it on first use.
+
+    Used as ``except _http_error() as e`` – the expression is only evaluated
+    while an exception is propagating, so it never forces the import.
+    """
+    from googleapiclient.errors import HttpError
+    return HttpError
+
+
+def _refresh_error() -> type:
+    """Return google-auth's RefreshError (revoked or expired credentials), imported lazily like _http_error."""
+    from google.auth.exceptions import RefreshError
+    return RefreshError
+
+
+def _http_error_reason(error: HttpError) -> Optional[str]:
+    details = getattr(error, "error_details", None)
+    if isinstance(details, list) and details and isinstance(details[0], dict):
+        return details[0].get("reason")
+    return None
+
+
 class YoutubePlaylistListener(commands.Cog):
-    """Collect YouTube links and keep seasonal playlists up-to-date."""
+    """Collect music links and keep seasonal YouTube playlists up-to-date."""
 
     def __init__(self, bot):
         self.bot = bot
@@ -57,23 +593,101 @@ class YoutubePlaylistListener(commands.Cog):
             playlists={},
             added_video_ids=[],
             contributors={},
+            scrape_checkpoint=None,     # id of the last message scrapeall handled
+            season_contributors={},     # {"Fall 2025": {user_id: count}}
         )
 
         self.yt_service: Optional[object] = None
+        self._creds: Optional[Credentials] = None
+
+        # googleapiclient's httplib2 transport is not thread-safe, so each pool
+        # thread gets its own authorized session and keeps its connections alive.
+        self._api_pool = ThreadPoolExecutor(max_workers=YT_API_THREADS, thread_name_prefix="youtube-api")
+        self._api_local = threading.local()
+        self._api_metrics = _ApiMetrics()
+        self._service_lock = asyncio.Lock()
+        self._playlist_locks: Dict[tuple, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+        # Per-guild state loaded once and kept in memory; see _VideoIndex.
+        self._indexes: Dict[int, _VideoIndex] = {}
+        self._stats: Dict[int, _ContributionStats] = {}
+        self._dirty_contributors: Set[int] = set()
+        self._state_lock = asyncio.Lock()
+
+        # Pending inserts, drained by _insert_worker once the API client is up.
+        self._queue = _InsertQueue(os.path.join(DATA_DIR, "insert_queue.json"))
+        self._queue.load()
+        self._pending: Set[tuple] = {(j["guild_id"], j["video_id"]) for j in self._queue.jobs}
+        self._queue_event = asyncio.Event()
+        self._worker_task: Optional[asyncio.Task] = None
+
+        self._quota = _QuotaLedger(os.path.join(DATA_DIR, "quota_ledger.json"))
+        self._quota.load()
+        self._video_status = _VideoStatusCache()
+        self._scrapes: Dict[int, asyncio.Task] = {}
+
+        # Per-platform sinks: (message, [(canonical_id, url), …], index, priority) -> collected.
+        # Platforms without an entry fall back to _log_links.
+        self._link_log = _LinkLog(LINK_LOG_PATH)
+        self._sinks: Dict[str, Callable[..., int]] = {
+            "youtube": self._enqueue_videos,
+        }
+
+        self.router = get_message_router(bot)
+        self.rest = get_rest_scheduler(bot)
+
         self.bot.loop.create_task(self._startup())
+        self._flush_loop.start()
+        self._precreate_loop.start()
+
+    async def cog_load(self):
+        for gid, data in (await self.config.all_guilds()).items():
+            self.router.set_channels("YoutubePlaylistListener", gid, [data.get("channel_id")])
+        self.router.register("YoutubePlaylistListener", on_message=self._on_link_message)
+
+    async def cog_unload(self):
+        self.router.unregister("YoutubePlaylistListener")
+        self._flush_loop.cancel()
+        self._precreate_loop.cancel()
+        if self._worker_task:
+            self._worker_task.cancel()
+        for task in self._scrapes.values():
+            task.cancel()
+        await self._save_queue()
+        await self._flush_state()
+        self._api_pool.shutdown(wait=False, cancel_futures=True)
+        for index in self._indexes.values():
+            index.close()
+        self._link_log.close()
 
     # ------------------------------------------------------------------
     # Startup & credential handling
     # ------------------------------------------------------------------
     async def _startup(self):
         await self.bot.wait_until_ready()
-        try:
-            self.yt_service = await asyncio.to_thread(self._build_youtube_service)
-            log.info("YouTube API client initialised.")
-        except Exception:
-            log.exception("Failed to create YouTube API client:")
+        self._worker_task = asyncio.create_task(self._insert_worker())
+
+    async def _ensure_service(self) -> bool:
+        """Build the YouTube client on first use. Return False if it is unavailable."""
+        if self.yt_service is not None:
+            return True
+        async with self._service_lock:
+            if self.yt_service is None:
+                started = time.perf_counter()
+                try:
+                    self.yt_service = await asyncio.to_thread(self._build_youtube_service)
+                except Exception:
+                    log.exception("Failed to create YouTube API client:")
+                    return False
+                log.info("YouTube API client initialised in %.2fs.", time.perf_counter() - started)
+        return True
 
     def _build_youtube_service(self):
+        from google.auth.transport.requests import Request
+        from google.oauth2.credentials import Credentials
+        from google_auth_oauthlib.flow import InstalledAppFlow
+        from googleapiclient.discovery import build
+
         cred_path = "data/YoutubePlaylistCog/credentials.json"
         token_path = "data/YoutubePlaylistCog/token.json"
 
@@ -103,6 +717,7 @@ class YoutubePlaylistListener(commands.Cog):
                 fp.write(creds.to_json())
                 log.info("Saved new refresh token to token.json")
 
+        self._creds = creds
         return build("youtube", "v3", credentials=creds, cache_discovery=False)
 
     @staticmethod
@@ -128,14 +743,124 @@ class YoutubePlaylistListener(commands.Cog):
 
         return f"Unknown {year}"
 
+    # ------------------------------------------------------------------
+    # Local state – video index & contributor counters
+    # ------------------------------------------------------------------
+    async def _get_index(self, guild: discord.Guild) -> _VideoIndex:
+        index = self._indexes.get(guild.id)
+        if index is not None:
+            return index
+        async with self._state_lock:
+            if guild.id not in self._indexes:
+                conf = self.config.guild(guild)
+                legacy = await conf.added_video_ids()
+                index = _VideoIndex(os.path.join(DATA_DIR, f"video_index_{guild.id}.log"))
+                await asyncio.to_thread(index.load, legacy)
+                if legacy:
+                    # The log now owns the history; drop the O(n) Config copy.
+                    await conf.added_video_ids.set([])
+                self._indexes[guild.id] = index
+        return self._indexes[guild.id]
+
+    async def _get_stats(self, guild: discord.Guild) -> _ContributionStats:
+        stats = self._stats.get(guild.id)
+        if stats is None:
+            conf = self.config.guild(guild)
+            stats = _ContributionStats(await conf.contributors(), await conf.season_contributors())
+            stats = self._stats.setdefault(guild.id, stats)
+        return stats
+
+    def _record_contribution(self, guild: discord.Guild, user_id: int, season_year: str, count: int = 1):
+        self._stats[guild.id].add(_season_label(season_year), str(user_id), count)
+        self._dirty_contributors.add(guild.id)
+
+    async def _flush_state(self):
+        """Write dirty contributor counters to Config and compact oversized logs."""
+        dirty, self._dirty_contributors = self._dirty_contributors, set()
+        for gid in dirty:
+            stats = self._stats[gid]
+            conf = self.config.guild_from_id(gid)
+            await conf.contributors.set(dict(stats.all_time.counts))
+            await conf.season_contributors.set(stats.season_counts())
+        for index in list(self._indexes.values()):
+            if index.needs_compaction():
+                await index.compact()
+        if self._quota.dirty:
+            # charge() keeps mutating spent on the loop while the thread writes
+            try:
+                await asyncio.to_thread(self._quota.save, self._quota.snapshot())
+            except BaseException:
+                self._quota.dirty = True
+                raise
+
+    @tasks.loop(seconds=CONTRIBUTOR_FLUSH_SECONDS)
+    async def _flush_loop(self):
+        try:
+            await self._flush_state()
+        except Exception:
+            log.exception("Failed flushing YouTube collector state")
+
     # ------------------------------------------------------------------
     # Playlist utilities
     # ------------------------------------------------------------------
+    def _thread_http(self) -> google_auth_httplib2.AuthorizedHttp:
+        http = getattr(self._api_local, "http", None)
+        if http is None:
+            import google_auth_httplib2
+            import httplib2
+
+            http = google_auth_httplib2.AuthorizedHttp(
+                self._creds, http=httplib2.Http(timeout=YT_API_HTTP_TIMEOUT)
+            )
+            self._api_local.http = http
+        return http
+
+    async def _execute(self, op: str, request: Callable[[], object]) -> dict:
+        """Execute the API request built by *request* on the YouTube pool, charging its quota cost.
+
+        Quota is charged once Google has answered, success or HttpError alike;
+        requests that never reach Google (auth refresh, DNS, timeouts) cost nothing.
+        """
+        if not await self._ensure_service():
+            raise RuntimeError("YouTube API client unavailable")
+        metrics = self._api_metrics
+        submitted = time.perf_counter()
+        metrics.submitted()
+
+        def run():
+            started = time.perf_counter()
+            metrics.started(started - submitted)
+            ok = False
+            try:
+                result = request().execute(http=self._thread_http())
+                ok = True
+                return result
+            finally:
+                metrics.finished(op, time.perf_counter() - started, ok)
+
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._api_pool, run)
+        except _http_error():
+            self._quota.charge(op)
+            raise
+        finally:
+            METRICS.histogram("pmpadmin_youtube_api_seconds", op=op).observe(time.perf_counter() - submitted)
+        self._quota.charge(op)
+        return result
+
     async def _ensure_playlist(self, guild: discord.Guild, season_year: str) -> str:
         playlists: Dict[str, str] = await self.config.guild(guild).playlists()
         if season_year in playlists:
             return playlists[season_year]
 
+        # Serialise creation so concurrent first posts of a season share one playlist.
+        async with self._playlist_locks[(guild.id, season_year)]:
+            playlists = await self.config.guild(guild).playlists()
+            if season_year in playlists:
+                return playlists[season_year]
+            return await self._create_playlist(guild, season_year, playlists)
+
+    async def _create_playlist(self, guild: discord.Guild, season_year: str, playlists: Dict[str, str]) -> str:
         body = {
             "snippet": {
                 "title": season_year,
@@ -147,16 +872,41 @@ class YoutubePlaylistListener(commands.Cog):
         def create_playlist():
             return self.yt_service.playlists().insert(
                 part="snippet,status", body=body
-            ).execute()
-        resp = await asyncio.to_thread(create_playlist)
+            )
+        resp = await self._execute("playlists.insert", create_playlist)
         playlist_id = resp["id"]
         playlists[season_year] = playlist_id
         await self.config.guild(guild).playlists.set(playlists)
         log.info("Created playlist %s (%s) for guild %s", season_year, playlist_id, guild.id)
         return playlist_id
 
+    @tasks.loop(hours=PLAYLIST_PRECREATE_CHECK_HOURS)
+    async def _precreate_loop(self):
+        """Create the upcoming season's playlist ahead of its first post."""
+        upcoming = self._season_year(datetime.now(LA_TZ) + timedelta(days=PLAYLIST_PRECREATE_DAYS))
+        for gid, data in (await self.config.all_guilds()).items():
+            if data.get("channel_id") is None or upcoming in data.get("playlists", {}):
+                continue
+            guild = self.bot.get_guild(gid)
+            if guild is None or not await self._ensure_service():
+                continue
+            if not self._quota.can_spend(QUOTA_COSTS["playlists.insert"], PRIORITY_BACKFILL):
+                continue
+            try:
+                await self._ensure_playlist(guild, upcoming)
+            except Exception:
+                log.exception("Failed to pre-create playlist %s for guild %s", upcoming, gid)
+
+    @_precreate_loop.before_loop
+    async def _before_precreate(self):
+        await self.bot.wait_until_ready()
+
     async def _add_video(self, playlist_id: str, video_id: str) -> bool:
-        """Insert a video into the playlist, skipping missing videos. Return True if added"""
+        """Insert a video into the playlist, skipping missing videos. Return True if added.
+
+        Any error other than a duplicate/missing video is re-raised so the
+        insert worker can decide whether to retry it.
+        """
         body = {
             "snippet": {
                 "playlistId": playlist_id,
@@ -166,61 +916,285 @@ class YoutubePlaylistListener(commands.Cog):
         def insert_item():
             return self.yt_service.playlistItems().insert(
                 part="snippet", body=body
-            ).execute()
+            )
         try:
-            await asyncio.to_thread(insert_item)
+            await self._execute("playlistItems.insert", insert_item)
             return True
-        except HttpError as e:
+        except _http_error() as e:
             status = getattr(e.resp, 'status', None)
             # 409 = duplicate, 404 = video not found; both can be ignored
             if status in (409, 404):
                 log.warning("Skipping video %s: %s", video_id, e.error_details if hasattr(e, 'error_details') else e)
                 return False
+            raise
 
-    async def _process_message(self, message: discord.Message) -> bool:
-        matches = YOUTUBE_LINK_REGEX.findall(message.content)
-        if not matches or self.yt_service is None:
-            return False
+    async def _check_videos(self, video_ids: Iterable[str]) -> None:
+        """Look up uncached IDs with ``videos.list`` (50 per call) and cache the result.
 
-        conf = self.config.guild(message.guild)
-        added = await conf.added_video_ids()
-        contributors = await conf.contributors()
-        wrote_any = False
+        A video is available when it exists, is not private and its upload was
+        not rejected. Embeddability is cached too, but does not block inserts.
+        """
+        unknown = [vid for vid in dict.fromkeys(video_ids) if self._video_status.get(vid) is None]
+        for start in range(0, len(unknown), VIDEO_CHECK_BATCH):
+            chunk = unknown[start:start + VIDEO_CHECK_BATCH]
+            if not self._quota.can_spend(QUOTA_COSTS["videos.list"]):
+                return
+
+            def list_videos():
+                return self.yt_service.videos().list(
+                    part="status", id=",".join(chunk), maxResults=VIDEO_CHECK_BATCH
+                )
+            try:
+                resp = await self._execute("videos.list", list_videos)
+            except _http_error() as e:
+                log.warning("videos.list pre-check failed (%s); inserting unchecked", e)
+                return
 
-        for vid in matches:
-            if vid in added:
+            found = {item["id"]: item.get("status", {}) for item in resp.get("items", [])}
+            for vid in chunk:
+                status = found.get(vid)
+                if status is None:
+                    self._video_status.put(vid, False, False)
+                    continue
+                available = (
+                    status.get("privacyStatus") != "private"
+                    and status.get("uploadStatus") not in ("deleted", "failed", "rejected")
+                )
+                self._video_status.put(vid, available, status.get("embeddable", True))
+
+    async def _process_message(self, message: discord.Message, priority: str = PRIORITY_LIVE) -> int:
+        """Collect every new music link in *message*; return how many were collected."""
+        links = _extract_links(message.content)
+        if not links:
+            return 0
+
+        index = await self._get_index(message.guild)
+        await self._get_stats(message.guild)
+        queued_before = len(self._queue.jobs)
+        collected = self._collect_links(message, links, index, priority)
+        if len(self._queue.jobs) != queued_before:
+            await self._save_queue()
+            self._queue_event.set()
+        return collected
+
+    def _collect_links(self, message: discord.Message, links: List[Tuple[str, str, str]], index: _VideoIndex, priority: str) -> int:
+        """Drop already-known links and hand the rest to their platform sinks in one batch each."""
+        batches: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
+        for platform, cid, url in links:
+            if cid in index or (message.guild.id, cid) in self._pending:
                 continue
-            playlist_id = await self._ensure_playlist(
-                message.guild, self._season_year(message.created_at)
-            )
-            added_success = await self._add_video(playlist_id, vid)
+            batches[platform].append((cid, url))
+        return sum(
+            self._sinks.get(platform, self._log_links)(message, batch, index, priority)
+            for platform, batch in batches.items()
+        )
+
+    def _log_links(self, message: discord.Message, links: List[Tuple[str, str]], index: _VideoIndex, priority: str) -> int:
+        """Sink for platforms without a playlist: record the link and credit the poster."""
+        season = self._season_year(message.created_at)
+        self._link_log.write([
+            {
+                "id": cid,
+                "url": url,
+                "guild_id": message.guild.id,
+                "message_id": message.id,
+                "author_id": message.author.id,
+                "season": season,
+            }
+            for cid, url in links
+        ])
+        for cid, _ in links:
+            index.add(cid)
+        self._record_contribution(message.guild, message.author.id, season, len(links))
+        return len(links)
+
+    def _enqueue_videos(self, message: discord.Message, links: List[Tuple[str, str]], index: _VideoIndex, priority: str) -> int:
+        """YouTube sink: append insert jobs without persisting the queue."""
+        season = self._season_year(message.created_at)
+        queued = 0
+
+        for vid, _ in links:
+            key = (message.guild.id, vid)
+            self._pending.add(key)
+            self._queue.jobs.append({
+                "guild_id": message.guild.id,
+                "channel_id": message.channel.id,
+                "message_id": message.id,
+                "author_id": message.author.id,
+                "video_id": vid,
+                "season": season,
+                "priority": priority,
+                "attempts": 0,
+                "not_before": 0,
+            })
+            queued += 1
+        return queued
+
+    # ------------------------------------------------------------------
+    # Insert worker
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _job_key(job: dict) -> tuple:
+        # Order is preserved per playlist *and* priority class, so a backfill
+        # parked until tomorrow's quota never holds back live posts.
+        return job["guild_id"], job["season"], job.get("priority", PRIORITY_LIVE)
+
+    def _ready_batch(self, now: float) -> List[dict]:
+        """Pick due jobs in queue order, never skipping past a waiting job of the same playlist."""
+        batch: List[dict] = []
+        blocked: Set[tuple] = set()
+        for job in self._queue.jobs:
+            key = self._job_key(job)
+            if key in blocked:
+                continue
+            if job["not_before"] > now:
+                blocked.add(key)
+                continue
+            batch.append(job)
+            if len(batch) >= INSERT_BATCH_SIZE:
+                break
+        return batch
+
+    async def _insert_worker(self):
+        while True:
+            try:
+                await self._insert_next_batch()
+            except Exception:
+                log.exception("Insert worker failed; retrying")
+                await asyncio.sleep(RETRY_BASE_SECONDS)
+
+    async def _insert_next_batch(self):
+        now = time.time()
+        batch = self._ready_batch(now)
+        if not batch:
+            self._queue_event.clear()
+            wake = min((j["not_before"] for j in self._queue.jobs), default=None)
+            timeout = None if wake is None else max(0.0, wake - now)
+            try:
+                await asyncio.wait_for(self._queue_event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            return
+        if not await self._ensure_service():
+            await asyncio.sleep(SERVICE_RETRY_SECONDS)
+            return
+
+        try:
+            await self._check_videos(job["video_id"] for job in batch)
+        except Exception:
+            log.exception("Video pre-check failed")
 
-            if not added_success:
+        groups: Dict[tuple, List[dict]] = defaultdict(list)
+        for job in batch:
+            groups[self._job_key(job)].append(job)
+        # (channel_id, message_id) -> priority of the job(s) that confirmed it
+        confirmed: Dict[tuple, str] = {}
+        try:
+            await asyncio.gather(*(self._drain_playlist(jobs, confirmed) for jobs in groups.values()))
+        except Exception:
+            log.exception("Insert worker batch failed")
+            await asyncio.sleep(RETRY_BASE_SECONDS)
+        await self._save_queue()
+
+        for (channel_id, message_id), priority in confirmed.items():
+            channel = self.bot.get_channel(channel_id)
+            if channel is None:
                 continue
+            # only back-fill confirmations are bulk work; live posts get their 🤖 promptly
+            rest_priority = Priority.BULK if priority == PRIORITY_BACKFILL else Priority.NOTICES
+            try:
+                await self.rest.run(rest_priority, channel.get_partial_message(message_id).add_reaction, "🤖")
+            except discord.HTTPException:
+                log.warning("Could not react to message %s", message_id)
+
+    async def _drain_playlist(self, jobs: List[dict], confirmed: Dict[tuple, str]):
+        """Run one playlist's jobs in order, stopping at the first one that must be retried."""
+        for job in jobs:
+            if not await self._run_insert(job, confirmed):
+                break
+
+    async def _save_queue(self):
+        await self._queue.persist()
+
+    def _finish_job(self, job: dict):
+        self._queue.jobs.remove(job)
+        self._pending.discard((job["guild_id"], job["video_id"]))
+
+    async def _run_insert(self, job: dict, confirmed: Dict[tuple, str]) -> bool:
+        """Attempt one insert. Return False if the job was rescheduled for a retry."""
+        guild = self.bot.get_guild(job["guild_id"])
+        if guild is None:
+            log.warning("Dropping insert of %s: guild %s unavailable", job["video_id"], job["guild_id"])
+            self._finish_job(job)
+            return True
+        status = self._video_status.get(job["video_id"])
+        if status is not None and not status[0]:
+            log.info("Skipping unavailable video %s", job["video_id"])
+            self._finish_job(job)
+            return True
+        priority = job.get("priority", PRIORITY_LIVE)
+        cost = QUOTA_COSTS["playlistItems.insert"]
+        if job["season"] not in await self.config.guild(guild).playlists():
+            cost += QUOTA_COSTS["playlists.insert"]
+        if not self._quota.can_spend(cost, priority):
+            job["not_before"] = self._quota.next_reset()
+            return False
+        try:
+            playlist_id = await self._ensure_playlist(guild, job["season"])
+            added = await self._add_video(playlist_id, job["video_id"])
+        except _http_error() as e:
+            status = getattr(e.resp, "status", None)
+            reason = _http_error_reason(e)
+            if reason == "quotaExceeded":
+                self._quota.exhaust()
+                job["not_before"] = self._quota.next_reset()
+                log.warning("YouTube quota exhausted; parking inserts until Pacific midnight")
+                return False
+            if status in RETRYABLE_STATUSES or reason in RETRYABLE_REASONS:
+                return self._reschedule(job, f"HTTP {status} {reason or ''}".strip())
+            log.error("Dropping insert of %s after HTTP %s: %s", job["video_id"], status, e)
+            self._finish_job(job)
+            return True
+        except _refresh_error() as e:
+            log.error("YouTube credentials were rejected (%s); delete data/YoutubePlaylistCog/token.json and reload to re-authorise", e)
+            return self._reschedule(job, "auth refresh failed")
+        except Exception as e:
+            # network errors (OSError, httplib2.ServerNotFoundError, …) and anything unexpected
+            return self._reschedule(job, repr(e))
 
-            added.append(vid)
-            wrote_any = True
-            uid = str(message.author.id)
-            contributors[uid] = contributors.get(uid, 0) + 1
+        self._finish_job(job)
+        if added:
+            (await self._get_index(guild)).add(job["video_id"])
+            await self._get_stats(guild)
+            self._record_contribution(guild, job["author_id"], job["season"])
+            key = (job["channel_id"], job["message_id"])
+            if confirmed.get(key) != PRIORITY_LIVE:
+                confirmed[key] = job.get("priority", PRIORITY_LIVE)
+        return True
 
-        if wrote_any:
-            await conf.added_video_ids.set(added)
-            await conf.contributors.set(contributors)
-        return wrote_any
+    def _reschedule(self, job: dict, why: str) -> bool:
+        job["attempts"] += 1
+        delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** job["attempts"])
+        delay = random.uniform(delay / 2, delay)
+        job["not_before"] = time.time() + delay
+        log.warning(
+            "Insert of %s failed (%s); retry %d in %.0fs",
+            job["video_id"], why, job["attempts"], delay,
+        )
+        return False
 
     # ------------------------------------------------------------------
     # Listeners
     # ------------------------------------------------------------------
-    @commands.Cog.listener("on_message")
-    async def on_message(self, message: discord.Message):
-        if message.author.bot or not message.guild:
+    async def _on_link_message(self, message: discord.Message):
+        """Routed by MessageRouter for messages in the monitored channel."""
+        # threads are routed by their parent; only the channel itself is monitored
+        if not message.guild:
             return
-        channel_id = await self.config.guild(message.guild).channel_id()
-        if channel_id is None or message.channel.id != channel_id:
+        if message.channel.id not in self.router.channels("YoutubePlaylistListener", message.guild.id):
             return
         try:
-            if await self._process_message(message):
-                await message.add_reaction("🤖")
+            await self._process_message(message)
         except Exception:
             log.exception(f"Failed processing message {message.id}")
 
@@ -237,23 +1211,227 @@ class YoutubePlaylistListener(commands.Cog):
     @ytpl.command(name="setchannel")
     async def _setchannel(self, ctx: commands.Context, channel: discord.TextChannel):
         await self.config.guild(ctx.guild).channel_id.set(channel.id)
-        await ctx.send(f"✅ Monitoring {channel.mention} for YouTube links.")
+        self.router.set_channels("YoutubePlaylistListener", ctx.guild.id, [channel.id])
+        await ctx.send(f"✅ Monitoring {channel.mention} for music links.")
+
+    # ------------------------------------------------------------------
+    # Backfill
+    # ------------------------------------------------------------------
+    async def _read_history(self, channel: discord.TextChannel, after: Optional[int], out: asyncio.Queue):
+        """Stream channel history into *out*, keeping only messages with a YouTube link."""
+        after_obj = discord.Object(id=after) if after else None
+        try:
+            async for m in channel.history(limit=None, oldest_first=True, after=after_obj):
+                # Pass every message so the checkpoint advances, but strip the
+                # link-free ones down to their ID before they reach the consumer.
+                await out.put(m if MUSIC_LINK_REGEX.search(m.content) else m.id)
+        finally:
+            await out.put(None)
+
+    async def _run_backfill(self, guild: discord.Guild, channel: discord.TextChannel, status: discord.Message):
+        conf = self.config.guild(guild)
+        checkpoint = await conf.scrape_checkpoint()
+        index = await self._get_index(guild)
+        await self._get_stats(guild)
+
+        feed: asyncio.Queue = asyncio.Queue(maxsize=SCRAPE_READ_AHEAD)
+        reader = asyncio.create_task(self._read_history(channel, checkpoint, feed))
+        scanned = queued = pending = 0
+        last_report = time.monotonic()
+
+        async def commit():
+            await self._save_queue()
+            await conf.scrape_checkpoint.set(checkpoint)
+            self._queue_event.set()
+
+        try:
+            while True:
+                item = await feed.get()
+                if item is None:
+                    break
+                scanned += 1
+                pending += 1
+                if isinstance(item, int):
+                    checkpoint = item
+                else:
+                    checkpoint = item.id
+                    queued += self._collect_links(item, _extract_links(item.content), index, PRIORITY_BACKFILL)
+                if pending >= SCRAPE_BATCH_MESSAGES:
+                    await commit()
+                    pending = 0
+                if time.monotonic() - last_report >= SCRAPE_PROGRESS_SECONDS:
+                    last_report = time.monotonic()
+                    await status.edit(content=f"⏳ Back-filling {channel.mention}: scanned **{scanned}** messages, collected **{queued}** links…")
+            await reader
+        finally:
+            reader.cancel()
+            await commit()
+        return scanned, queued
 
     @ytpl.command(name="scrapeall")
-    async def _scrapeall(self, ctx: commands.Context):
+    async def _scrapeall(self, ctx: commands.Context, restart: bool = False):
+        """Back-fill the monitored channel, resuming from the last checkpoint.
+
+        Pass `True` to discard the checkpoint and start from the oldest message.
+        """
         channel_id = await self.config.guild(ctx.guild).channel_id()
         if channel_id is None:
             return await ctx.send("⚠️ Monitoring channel not configured.")
         channel = ctx.guild.get_channel(channel_id)
         if channel is None:
             return await ctx.send("⚠️ Configured channel invalid; please re-set.")
-        msg = await ctx.send(f"⏳ Back-filling {channel.mention} history…")
-        count = 0
-        async for m in channel.history(limit=None, oldest_first=True):
-            if await self._process_message(m):
-                await m.add_reaction("🤖")
-                count += 1
-        await msg.edit(content=f"✅ Finished. Added **{count}** videos.")
+        if self._scrape_running(ctx.guild.id):
+            return await ctx.send("⚠️ A backfill is already running. Use `!ytpl scrapecancel` to stop it.")
+        if restart:
+            await self.config.guild(ctx.guild).scrape_checkpoint.set(None)
+
+        resumed = await self.config.guild(ctx.guild).scrape_checkpoint()
+        msg = await ctx.send(f"⏳ {'Resuming' if resumed else 'Starting'} back-fill of {channel.mention} history…")
+        task = asyncio.create_task(self._run_backfill(ctx.guild, channel, msg))
+        self._scrapes[ctx.guild.id] = task
+        try:
+            scanned, count = await task
+        except asyncio.CancelledError:
+            return await msg.edit(content="⏹️ Back-fill cancelled; run `!ytpl scrapeall` again to resume.")
+        except Exception:
+            log.exception("Back-fill of %s failed", channel.id)
+            return await msg.edit(content="⚠️ Back-fill failed; run `!ytpl scrapeall` again to resume.")
+        finally:
+            self._scrapes.pop(ctx.guild.id, None)
+        await msg.edit(content=f"✅ Finished. Scanned **{scanned}** messages, collected **{count}** links.")
+
+    @ytpl.command(name="scrapecancel")
+    async def _scrapecancel(self, ctx: commands.Context):
+        """Stop a running back-fill; progress up to the checkpoint is kept."""
+        task = self._scrapes.get(ctx.guild.id)
+        if not task or task.done():
+            return await ctx.send("No back-fill is running.")
+        task.cancel()
+
+    # ------------------------------------------------------------------
+    # Reconciliation
+    # ------------------------------------------------------------------
+    async def _list_pages(self, op: str, build_request: Callable[[Optional[str]], object]) -> List[dict]:
+        """Collect ``items`` from every page of a list call (one quota unit per page)."""
+        items: List[dict] = []
+        token: Optional[str] = None
+        while True:
+            resp = await self._execute(op, lambda token=token: build_request(token))
+            items.extend(resp.get("items", []))
+            token = resp.get("nextPageToken")
+            if not token:
+                return items
+
+    async def _adopt_season_playlists(self, guild: discord.Guild) -> int:
+        """Re-link our channel's seasonal playlists that local config has forgotten."""
+        conf = self.config.guild(guild)
+        playlists: Dict[str, str] = await conf.playlists()
+        known = set(playlists.values())
+        remote = await self._list_pages("playlists.list", lambda token: self.yt_service.playlists().list(
+            part="snippet", mine=True, maxResults=PAGE_SIZE, pageToken=token
+        ))
+        adopted = 0
+        for item in remote:
+            title = item["snippet"]["title"]
+            if item["id"] in known or title in playlists or not SEASON_TITLE_REGEX.match(title):
+                continue
+            playlists[title] = item["id"]
+            adopted += 1
+        if adopted:
+            await conf.playlists.set(playlists)
+        return adopted
+
+    @ytpl.command(name="reconcile")
+    async def _reconcile(self, ctx: commands.Context, fix_remote: bool = False):
+        """Diff local state against the seasonal playlists on YouTube and repair it.
+
+        Local state is made to match YouTube: videos found remotely are marked
+        as added, and videos missing from every playlist are forgotten. When any
+        are forgotten the `scrapeall` checkpoint is reset, so the next
+        `!ytpl scrapeall` rescans the channel from the start and re-inserts them
+        (links already on YouTube are skipped). Pass `True` to also delete
+        duplicate playlist entries on YouTube (50 quota units each).
+        """
+        if not await self._ensure_service():
+            return await ctx.send("⚠️ YouTube API client unavailable; check the logs.")
+        msg = await ctx.send("⏳ Reconciling playlists with YouTube…")
+        guild = ctx.guild
+        conf = self.config.guild(guild)
+        spent_before = self._quota.total
+        try:
+            adopted = await self._adopt_season_playlists(guild)
+            playlists: Dict[str, str] = await conf.playlists()
+            remote: Dict[str, List[str]] = defaultdict(list)  # video_id -> [playlistItem id, …]
+            missing_playlists = []
+            for title, playlist_id in playlists.items():
+                try:
+                    items = await self._list_pages("playlistItems.list", lambda token, pid=playlist_id: self.yt_service.playlistItems().list(
+                        part="contentDetails", playlistId=pid, maxResults=PAGE_SIZE, pageToken=token
+                    ))
+                except _http_error() as e:
+                    if getattr(e.resp, "status", None) != 404:
+                        raise
+                    missing_playlists.append(title)
+                    continue
+                for item in items:
+                    remote[item["contentDetails"]["videoId"]].append(item["id"])
+        except _http_error() as e:
+            return await msg.edit(content=f"⚠️ Reconciliation aborted: {e}")
+
+        # Playlists deleted on YouTube are dropped so _ensure_playlist recreates them.
+        if missing_playlists:
+            for title in missing_playlists:
+                playlists.pop(title, None)
+            await conf.playlists.set(playlists)
+
+        index = await self._get_index(guild)
+        remote_ids = set(remote)
+        # Only bare IDs are YouTube videos; other platforms carry a "platform:" prefix.
+        local_ids = {vid for vid in index.ids if ":" not in vid}
+        pulled = remote_ids - local_ids
+        forgotten = local_ids - remote_ids
+        for vid in pulled:
+            index.add(vid)
+        for vid in forgotten:
+            index.discard(vid)
+        rescan = bool(forgotten) and not self._scrape_running(guild.id)
+        if rescan:
+            await conf.scrape_checkpoint.set(None)
+
+        removed_dupes = 0
+        dupes = [item_id for item_ids in remote.values() for item_id in item_ids[1:]]
+        if fix_remote:
+            for item_id in dupes:
+                if not self._quota.can_spend(QUOTA_COSTS["playlistItems.delete"], PRIORITY_BACKFILL):
+                    break
+                try:
+                    await self._execute("playlistItems.delete", lambda item_id=item_id: self.yt_service.playlistItems().delete(id=item_id))
+                    removed_dupes += 1
+                except _http_error() as e:
+                    log.warning("Could not delete duplicate playlist item %s: %s", item_id, e)
+
+        lines = [
+            f"✅ Reconciled **{len(playlists)}** playlists ({len(remote_ids)} videos on YouTube).",
+            f"• Re-linked playlists: {adopted}",
+            f"• Marked as added from YouTube: {len(pulled)}",
+            f"• Forgotten (missing on YouTube): {len(forgotten)}",
+        ]
+        if rescan:
+            lines.append("  Scrape checkpoint reset: run `!ytpl scrapeall` to re-add them.")
+        elif forgotten:
+            lines.append("  A scrape is running; run `!ytpl scrapeall True` once it finishes to re-add them.")
+        if missing_playlists:
+            lines.append(f"• Playlists deleted on YouTube: {', '.join(missing_playlists)}")
+        if fix_remote:
+            lines.append(f"• Duplicate entries removed: {removed_dupes}/{len(dupes)}")
+        elif dupes:
+            lines.append(f"• Duplicate entries on YouTube: {len(dupes)} (run `!ytpl reconcile True` to remove)")
+        lines.append(f"Quota used: {self._quota.total - spent_before} units.")
+        await msg.edit(content="\n".join(lines))
+
+    def _scrape_running(self, guild_id: int) -> bool:
+        task = self._scrapes.get(guild_id)
+        return task is not None and not task.done()
 
     @ytpl.command(name="resetmetadata")
     @checks.admin_or_permissions(manage_guild=True)
@@ -262,27 +1440,105 @@ class YoutubePlaylistListener(commands.Cog):
         await self.config.guild(ctx.guild).playlists.set({})
         await self.config.guild(ctx.guild).added_video_ids.set([])
         await self.config.guild(ctx.guild).contributors.set({})
+        await self.config.guild(ctx.guild).season_contributors.set({})
+        await self.config.guild(ctx.guild).scrape_checkpoint.set(None)
+        index = await self._get_index(ctx.guild)
+        index.clear()
+        self._stats[ctx.guild.id] = _ContributionStats({}, {})
+        self._dirty_contributors.discard(ctx.guild.id)
         await ctx.send("✅ All YouTube metadata cleared. Use `!ytpl scrapeall` or post new links to repopulate.")
 
+    async def _send_leaderboard(self, ctx: commands.Context, title: str, board: _Leaderboard, header: List[str], limit: Optional[int] = None):
+        """Send *board* as embeds of LEADERBOARD_PAGE_ROWS rows, paginated with a menu."""
+        rows = board.top(limit)
+        pages: List[discord.Embed] = []
+        for start in range(0, max(len(rows), 1), LEADERBOARD_PAGE_ROWS):
+            lines = list(header) if not pages else []
+            for rank, (uid, num) in enumerate(rows[start:start + LEADERBOARD_PAGE_ROWS], start + 1):
+                member = ctx.guild.get_member(int(uid))
+                name = member.display_name if member else uid
+                pct = (num / board.total * 100) if board.total else 0
+                lines.append(f"{rank}. **{name}** – {num} links ({pct:.1f}%)")
+            if not rows:
+                lines.append("No contributions yet.")
+            pages.append(discord.Embed(title=title, description="\n".join(lines)))
+        if len(pages) == 1:
+            return await ctx.send(embed=pages[0])
+        for i, page in enumerate(pages, 1):
+            page.set_footer(text=f"Page {i}/{len(pages)}")
+        await menu(ctx, pages, DEFAULT_CONTROLS)
+
     @ytpl.command(name="metadata")
     async def _metadata(self, ctx: commands.Context):
         """Show collected video/playlist stats."""
-        added = await self.config.guild(ctx.guild).added_video_ids()
+        index = await self._get_index(ctx.guild)
         playlists = await self.config.guild(ctx.guild).playlists()
-        contributors = await self.config.guild(ctx.guild).contributors()
-        total_links = len(added)
-        total_playlists = len(playlists)
-        sorted_contrib = sorted(contributors.items(), key=lambda kv: kv[1], reverse=True)
-        lines = [
-            f"**Total links:** {total_links}",
-            f"**Total playlists:** {total_playlists}",
+        stats = await self._get_stats(ctx.guild)
+        header = [
+            f"**Total links:** {len(index)}",
+            f"**Total playlists:** {len(playlists)}",
             "",
             "**Contributors:**"
         ]
-        for uid, num in sorted_contrib:
-            member = ctx.guild.get_member(int(uid))
-            name = member.display_name if member else uid
-            pct = (num / total_links * 100) if total_links else 0
-            lines.append(f"• **{name}** – {num} links ({pct:.1f}%)")
-        embed = discord.Embed(title="YouTube Collector Stats", description="\n".join(lines))
-        await ctx.send(embed=embed)
\ No newline at end of file
+        await self._send_leaderboard(ctx, "YouTube Collector Stats", stats.all_time, header)
+
+    @ytpl.command(name="top")
+    async def _top(self, ctx: commands.Context, limit: Optional[int] = 10, *, season: str = None):
+        """Show the top contributors, all-time or for a season.
+
+        Usage:
+          `ytpl top`                 -> top 10 all-time
+          `ytpl top 25 Fall 2025`    -> top 25 for Fall 2025
+          `ytpl top 10 current`      -> top 10 for the running season
+          `ytpl top Fall 2025`       -> top 10 for Fall 2025
+        """
+        # a first word that is not a number is passed on to `season`; limit keeps its default
+        limit = 10 if limit is None else max(1, limit)
+        stats = await self._get_stats(ctx.guild)
+        if season is None or season.lower() in ("all", "alltime", "all-time"):
+            return await self._send_leaderboard(ctx, f"Top {limit} – All Time", stats.all_time, [], limit)
+        if season.lower() == "current":
+            season = _season_label(self._season_year(datetime.now(LA_TZ)))
+        board = next((b for name, b in stats.seasons.items() if name.lower() == season.lower()), None)
+        if board is None:
+            known = ", ".join(sorted(stats.seasons)) or "none yet"
+            return await ctx.send(f"No contributions recorded for '{season}'. Seasons: {known}")
+        await self._send_leaderboard(ctx, f"Top {limit} – {season.title()}", board, [], limit)
+
+    @ytpl.command(name="quota")
+    async def _quota_report(self, ctx: commands.Context):
+        """Show today's YouTube API quota spend and the pending insert backlog."""
+        ledger = self._quota
+        total = ledger.total
+        lines = [f"**Spent today ({ledger.day}, Pacific):** {total} / {DAILY_QUOTA} units"]
+        for op, units in sorted(ledger.spent.items(), key=lambda kv: kv[1], reverse=True):
+            lines.append(f"• `{op}` – {units}")
+        lines.append(f"**Remaining for live posts:** {ledger.remaining(PRIORITY_LIVE)}")
+        lines.append(f"**Remaining for backfill:** {ledger.remaining(PRIORITY_BACKFILL)}")
+
+        pending = defaultdict(int)
+        for job in self._queue.jobs:
+            pending[job.get("priority", PRIORITY_LIVE)] += 1
+        lines.append("")
+        lines.append(f"**Queued inserts:** {pending[PRIORITY_LIVE]} live, {pending[PRIORITY_BACKFILL]} backfill")
+        if pending[PRIORITY_BACKFILL]:
+            per_day = (DAILY_QUOTA - LIVE_QUOTA_RESERVE) // QUOTA_COSTS["playlistItems.insert"]
+            days = -(-pending[PRIORITY_BACKFILL] // per_day)
+            lines.append(f"Backfill needs about **{days}** day(s) of quota at {per_day} inserts/day.")
+        embed = discord.Embed(title="YouTube API Quota", description="\n".join(lines))
+        await ctx.send(embed=embed)
+
+    @ytpl.command(name="apistats")
+    async def _apistats(self, ctx: commands.Context):
+        """Show YouTube API pool queue depth and call latency."""
+        m = self._api_metrics
+        lines = [
+            f"**Threads:** {YT_API_THREADS} | **Running:** {m.running} | **Queued:** {m.queued}",
+            f"**Queue wait p50/p95:** {m.percentile(m.wait_times, 50) * 1000:.0f} / {m.percentile(m.wait_times, 95) * 1000:.0f} ms",
+            f"**Call latency p50/p95:** {m.percentile(m.latencies, 50) * 1000:.0f} / {m.percentile(m.latencies, 95) * 1000:.0f} ms",
+            "",
+        ]
+        for op, calls in sorted(m.calls.items()):
+            lines.append(f"• `{op}` – {calls} calls, {m.errors.get(op, 0)} errors")
+        embed = discord.Embed(title="YouTube API Pool", description="\n".join(lines))
+        await ctx.send(embed=embed)
@@ -1,18 +1,51 @@
+import logging
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
 from .PMPAdmin import PMPAdmin
 from .ExportMessages import ExportMessages
 from .YoutubePlaylistListener import YoutubePlaylistListener
 from .ChallengeScraper import ChallengeScraper
 from .RoleAssignment import RoleAssignment
 from .TalkModerator import TalkModerator
+from .EventRecorder import EventRecorder
+from .Profiler import Profiler
+from .LoopWatchdog import start_loop_watchdog, stop_loop_watchdog
+from .Metrics import install_http_hooks, instrument_cog, uninstall_http_hooks
+
+_IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+
+log = logging.getLogger("red.pmpadmin")
 
 __red_end_user_data_statement__ = (
     "This cog adds admin functions for PMP and other dope stuff."
 )
 
+COGS = (
+    PMPAdmin,
+    ExportMessages,
+    YoutubePlaylistListener,
+    ChallengeScraper,
+    RoleAssignment,
+    TalkModerator,
+    EventRecorder,
+    Profiler,
+)
+
 async def setup(bot):
-    await bot.add_cog(PMPAdmin(bot))
-    await bot.add_cog(ExportMessages(bot))
-    await bot.add_cog(YoutubePlaylistListener(bot))
-    await bot.add_cog(ChallengeScraper(bot))
-    await bot.add_cog(RoleAssignment(bot))
-    await bot.add_cog(TalkModerator(bot))
\ No newline at end of file
+    install_http_hooks(bot)
+    start_loop_watchdog(bot)
+    timings = []
+    for cog_cls in COGS:
+        started = time.perf_counter()
+        cog = cog_cls(bot)
+        instrument_cog(cog)
+        await bot.add_cog(cog)
+        timings.append(f"{cog_cls.__name__} {(time.perf_counter() - started) * 1000:.1f}ms")
+    log.info("PMPAdmin imported in %.1fms; setup: %s", _IMPORT_SECONDS * 1000, ", ".join(timings))
+
+
+async def teardown(bot):
+    uninstall_http_hooks(bot)
+    stop_loop_watchdog(bot)
@@ -0,0 +1,447 @@
+"""Lightweight stand-ins for the discord.py and Red objects the cogs touch.
+
+Only the attributes and coroutines the PMPAdmin hot paths use are modelled.
+Every outbound Discord call goes through ``FakeRest`` instead of the network
+and is counted per endpoint and per calling cog. Classes the cogs
+``isinstance``-check (``discord.Member``, ``discord.Thread`` and
+``discord.ForumChannel``) subclass the real type without running its
+constructor. Everything else is a plain object.
+"""
+import asyncio
+import copy
+import itertools
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+from unittest import mock
+
+import discord
+from redbot.core import Config
+
+from PMPAdmin.Metrics import current_cog
+
+_ids = itertools.count(1_000_000_000_000_000_000)
+
+
+def snowflake() -> int:
+    return next(_ids)
+
+
+# ----------------------------------------------------------------------
+# REST
+# ----------------------------------------------------------------------
+class FakeRest:
+    """Counts outbound calls per endpoint and per cog; *latency* seconds are awaited per call."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls: Counter = Counter()
+        self.by_cog: Counter = Counter()
+
+    async def call(self, endpoint: str):
+        self.calls[endpoint] += 1
+        self.by_cog[current_cog.get()] += 1
+        await asyncio.sleep(self.latency)
+
+    def reset(self) -> Dict[str, int]:
+        calls, self.calls, self.by_cog = dict(self.calls), Counter(), Counter()
+        return calls
+
+
+# ----------------------------------------------------------------------
+# Red Config
+# ----------------------------------------------------------------------
+class _FakeValue:
+    def __init__(self, store: dict, key: str, default):
+        self._store, self._key, self._default = store, key, default
+
+    async def __call__(self):
+        # Red hands out copies of stored containers; keep that cost in the picture
+        return copy.deepcopy(self._store.get(self._key, self._default))
+
+    async def set(self, value):
+        self._store[self._key] = copy.deepcopy(value)
+
+
+class _FakeGroup:
+    def __init__(self, store: dict, defaults: dict):
+        self._store, self._defaults = store, defaults
+
+    def __getattr__(self, key: str) -> _FakeValue:
+        if key not in self._defaults:
+            raise AttributeError(key)
+        return _FakeValue(self._store, key, self._defaults[key])
+
+
+class FakeConfig:
+    """Dict-backed replacement for ``Config`` supporting the guild scope."""
+
+    def __init__(self):
+        self._defaults: dict = {}
+        self._guilds: Dict[int, dict] = {}
+
+    @classmethod
+    def get_conf(cls, cog_instance, identifier: int, force_registration: bool = False, **kwargs) -> "FakeConfig":
+        return cls()
+
+    def register_guild(self, **defaults):
+        self._defaults.update(defaults)
+
+    def guild_from_id(self, guild_id: int) -> _FakeGroup:
+        return _FakeGroup(self._guilds.setdefault(guild_id, {}), self._defaults)
+
+    def guild(self, guild) -> _FakeGroup:
+        return self.guild_from_id(guild.id)
+
+    async def all_guilds(self) -> Dict[int, dict]:
+        return {gid: {**copy.deepcopy(self._defaults), **copy.deepcopy(data)} for gid, data in self._guilds.items()}
+
+
+@contextmanager
+def fake_config():
+    """Make ``Config.get_conf`` return a FakeConfig for cogs created inside the block."""
+    with mock.patch.object(Config, "get_conf", FakeConfig.get_conf):
+        yield
+
+
+# ----------------------------------------------------------------------
+# Users, members, roles
+# ----------------------------------------------------------------------
+class FakeRole:
+    def __init__(self, guild: "FakeGuild", name: str, role_id: Optional[int] = None, default: bool = False):
+        self.id = role_id or snowflake()
+        self.name = name
+        self.guild = guild
+        self._default = default
+
+    def is_default(self) -> bool:
+        return self._default
+
+    @property
+    def members(self) -> List["FakeMember"]:
+        return [m for m in self.guild.members if self in m.roles]
+
+    def __repr__(self):
+        return f"<FakeRole {self.name}>"
+
+
+class FakeUser:
+    """A user who is not (or no longer) in the member cache."""
+
+    def __init__(self, name: str, user_id: Optional[int] = None, bot: bool = False):
+        self.id = user_id or snowflake()
+        self.name = self.display_name = self.global_name = name
+        self.bot = bot
+        self.mention = f"<@{self.id}>"
+
+
+class FakeMember(discord.Member):
+    # shadow the slots/properties of discord.Member with plain attributes
+    id = name = display_name = bot = roles = joined_at = guild = mention = None
+
+    def __init__(self, guild: "FakeGuild", name: str, roles: Iterable[FakeRole] = (),
+                 joined_at: Optional[datetime] = None, user_id: Optional[int] = None, bot: bool = False):
+        self.id = user_id or snowflake()
+        self.name = self.display_name = name
+        self.bot = bot
+        self.guild = guild
+        self.roles = [guild.default_role, *roles]
+        self.joined_at = joined_at or datetime.now(timezone.utc)
+        self.mention = f"<@{self.id}>"
+
+    def __eq__(self, other):
+        return getattr(other, "id", None) == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return f"<FakeMember {self.name}>"
+
+    async def edit(self, *, roles=None, reason=None, **kwargs):
+        await self.guild.rest.call("member.edit")
+        if roles is not None:
+            by_id = {r.id: r for r in self.guild.roles}
+            self.roles = [self.guild.default_role, *(by_id[r.id] for r in roles if r.id in by_id)]
+
+    async def add_roles(self, *roles, reason=None):
+        await self.guild.rest.call("member.add_roles")
+        self.roles.extend(r for r in roles if r not in self.roles)
+
+    async def remove_roles(self, *roles, reason=None):
+        await self.guild.rest.call("member.remove_roles")
+        self.roles = [r for r in self.roles if r not in roles]
+
+    async def kick(self, *, reason=None):
+        await self.guild.rest.call("member.kick")
+
+    async def send(self, content=None, **kwargs):
+        await self.guild.rest.call("dm.send")
+
+
+# ----------------------------------------------------------------------
+# Channels, threads, messages
+# ----------------------------------------------------------------------
+class FakeAttachment:
+    def __init__(self, filename: str, content_type: Optional[str] = None):
+        self.id = snowflake()
+        self.filename = filename
+        self.content_type = content_type
+        self.url = f"https://cdn.discordapp.com/attachments/{self.id}/{filename}"
+
+
+class FakeMessage:
+    def __init__(self, channel, author, content: str = "", attachments: Iterable[FakeAttachment] = (),
+                 stickers: Iterable = (), created_at: Optional[datetime] = None, message_id: Optional[int] = None):
+        self.id = message_id or snowflake()
+        self.channel = channel
+        self.guild = getattr(channel, "guild", None)
+        self.author = author
+        self.content = content
+        self.attachments = list(attachments)
+        self.stickers = list(stickers)
+        self.created_at = created_at or datetime.now(timezone.utc)
+        self.reactions: List = []
+
+    @property
+    def rest(self) -> FakeRest:
+        return self.channel.rest
+
+    async def delete(self):
+        await self.rest.call("message.delete")
+
+    async def edit(self, **kwargs):
+        await self.rest.call("message.edit")
+        self.content = kwargs.get("content", self.content)
+        return self
+
+    async def add_reaction(self, emoji):
+        await self.rest.call("message.add_reaction")
+
+
+class FakeTextChannel:
+    def __init__(self, guild: "FakeGuild", name: str, channel_id: Optional[int] = None):
+        self.id = channel_id or snowflake()
+        self.name = name
+        self.guild = guild
+        self.mention = f"<#{self.id}>"
+        self.messages: List[FakeMessage] = []
+
+    @property
+    def rest(self) -> FakeRest:
+        return self.guild.rest
+
+    async def send(self, content=None, **kwargs) -> FakeMessage:
+        await self.rest.call("channel.send")
+        message = FakeMessage(self, self.guild.me, content or "")
+        self.messages.append(message)
+        return message
+
+    async def fetch_message(self, message_id: int) -> FakeMessage:
+        await self.rest.call("channel.fetch_message")
+        for m in self.messages:
+            if m.id == message_id:
+                return m
+        raise discord.NotFound(_FakeResponse(404), "Unknown Message")
+
+    async def history(self, limit: Optional[int] = 100, oldest_first: bool = False, after=None, before=None):
+        messages = self.messages if oldest_first else list(reversed(self.messages))
+        if after is not None:
+            messages = [m for m in messages if m.id > after.id]
+        for start in range(0, len(messages) if limit is None else min(limit, len(messages)), 100):
+            # one REST page per 100 messages, like the real paginator
+            await self.rest.call("channel.history")
+            for m in messages[start:start + 100]:
+                yield m
+
+
+class FakeThread(FakeTextChannel, discord.Thread):
+    # shadow the read-only properties of discord.Thread
+    parent = created_at = mention = None
+
+    def __init__(self, parent: "FakeForumChannel", name: str, thread_id: Optional[int] = None):
+        super().__init__(parent.guild, name, thread_id)
+        self.parent = parent
+        self.parent_id = parent.id
+        self.created_at = datetime.now(timezone.utc)
+
+    async def edit(self, **kwargs):
+        await self.rest.call("thread.edit")
+        return self
+
+
+class FakeForumChannel(discord.ForumChannel):
+    threads = mention = None
+
+    def __init__(self, guild: "FakeGuild", name: str, channel_id: Optional[int] = None):
+        self.id = channel_id or snowflake()
+        self.name = name
+        self.guild = guild
+        self.mention = f"<#{self.id}>"
+        self.threads: List[FakeThread] = []
+
+    def get_thread(self, thread_id: int) -> Optional[FakeThread]:
+        return next((t for t in self.threads if t.id == thread_id), None)
+
+    def create_day_thread(self, name: str, thread_id: Optional[int] = None) -> FakeThread:
+        thread = FakeThread(self, name, thread_id)
+        self.threads.append(thread)
+        self.guild.add_channel(thread)
+        return thread
+
+    async def create_thread(self, *, name: str, content: Optional[str] = None, **kwargs):
+        await self.guild.rest.call("forum.create_thread")
+        thread = self.create_day_thread(name)
+        message = FakeMessage(thread, self.guild.me, content or "")
+        thread.messages.append(message)
+        return thread, message
+
+    async def archived_threads(self, *, limit: Optional[int] = 100, **kwargs):
+        await self.guild.rest.call("forum.archived_threads")
+        return
+        yield
+
+
+class _FakeResponse:
+    def __init__(self, status: int):
+        self.status = status
+        self.reason = "fake"
+
+
+# ----------------------------------------------------------------------
+# Guild and bot
+# ----------------------------------------------------------------------
+class FakeGuild:
+    def __init__(self, bot: "FakeBot", name: str = "Fake Guild", guild_id: Optional[int] = None):
+        self.id = guild_id or snowflake()
+        self.name = name
+        self.bot = bot
+        self.rest = bot.rest
+        self.default_role = FakeRole(self, "@everyone", role_id=self.id, default=True)
+        self.roles: List[FakeRole] = [self.default_role]
+        self.members: List[FakeMember] = []
+        self._members: Dict[int, FakeMember] = {}
+        # members that exist server-side but are missing from the gateway cache
+        self._uncached: Dict[int, FakeMember] = {}
+        self.channels: Dict[int, object] = {}
+        self.me = FakeMember(self, "PMPBot", user_id=bot.user.id, bot=True)
+
+    def add_role(self, name: str) -> FakeRole:
+        role = FakeRole(self, name)
+        self.roles.append(role)
+        return role
+
+    def add_member(self, member: FakeMember, cached: bool = True) -> FakeMember:
+        if cached:
+            self.members.append(member)
+            self._members[member.id] = member
+        else:
+            self._uncached[member.id] = member
+        return member
+
+    def add_channel(self, channel):
+        self.channels[channel.id] = channel
+        return channel
+
+    def get_member(self, user_id: int) -> Optional[FakeMember]:
+        return self._members.get(user_id)
+
+    def get_role(self, role_id: int) -> Optional[FakeRole]:
+        return next((r for r in self.roles if r.id == role_id), None)
+
+    def get_channel(self, channel_id: int):
+        return self.channels.get(channel_id)
+
+    get_channel_or_thread = get_channel
+
+    async def query_members(self, query=None, *, limit=5, user_ids=None, presences=False, cache=True):
+        await self.rest.call("gateway.query_members")
+        found = [self._uncached[uid] for uid in user_ids or () if uid in self._uncached]
+        if cache:
+            for member in found:
+                self.add_member(self._uncached.pop(member.id))
+        return found[:limit]
+
+    async def fetch_member(self, user_id: int) -> FakeMember:
+        await self.rest.call("guild.fetch_member")
+        member = self._members.get(user_id) or self._uncached.get(user_id)
+        if member is None:
+            raise discord.NotFound(_FakeResponse(404), "Unknown Member")
+        return member
+
+
+class FakeBot:
+    """Just enough of Red's bot: guild lookup, listener registry, loop, user."""
+
+    def __init__(self, rest_latency: float = 0.0):
+        self.rest = FakeRest(rest_latency)
+        self.user = FakeUser("PMPBot", bot=True)
+        self.guilds: Dict[int, FakeGuild] = {}
+        self.extra_events: Dict[str, list] = {}
+        # never set: startup tasks that wait for READY stay parked offline
+        self._ready = asyncio.Event()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return asyncio.get_running_loop()
+
+    def add_guild(self, name: str = "Fake Guild", guild_id: Optional[int] = None) -> FakeGuild:
+        guild = FakeGuild(self, name, guild_id)
+        self.guilds[guild.id] = guild
+        return guild
+
+    def get_guild(self, guild_id: int) -> Optional[FakeGuild]:
+        return self.guilds.get(guild_id)
+
+    def get_channel(self, channel_id: int):
+        for guild in self.guilds.values():
+            channel = guild.get_channel(channel_id)
+            if channel is not None:
+                return channel
+        return None
+
+    def add_listener(self, func, name: str):
+        self.extra_events.setdefault(name, []).append(func)
+
+    def remove_listener(self, func, name: str):
+        if func in self.extra_events.get(name, []):
+            self.extra_events[name].remove(func)
+
+    def add_cog_listeners(self, cog):
+        for name, method in cog.get_listeners():
+            self.add_listener(method, name)
+
+    def dispatch(self, event: str, *args) -> List[asyncio.Task]:
+        """Run every listener for *event* in its own task, as discord.py does."""
+        return [asyncio.create_task(func(*args)) for func in self.extra_events.get(event, ())]
+
+    async def wait_until_ready(self):
+        await self._ready.wait()
+
+
+class FakeEmoji:
+    def __init__(self, name: str, emoji_id: Optional[int] = None):
+        self.name = name
+        self.id = emoji_id
+
+    def __str__(self):
+        return f"<:{self.name}:{self.id}>" if self.id else self.name
+
+
+class FakeReactionPayload:
+    """Stand-in for ``discord.RawReactionActionEvent``."""
+
+    def __init__(self, guild: FakeGuild, message_id: int, user_id: int, emoji: FakeEmoji,
+                 member: Optional[FakeMember] = None, event_type: str = "REACTION_ADD"):
+        self.guild_id = guild.id
+        self.channel_id = None
+        self.message_id = message_id
+        self.user_id = user_id
+        self.emoji = emoji
+        self.member = member
+        self.event_type = event_type
+
+
+def days_ago(days: float) -> datetime:
+    return datetime.now(timezone.utc) - timedelta(days=days)
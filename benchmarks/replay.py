@@ -0,0 +1,343 @@
+"""Replay a recorded gateway event log through the real cog listeners.
+
+Recordings come from the ``eventrecord`` command (PMPAdmin/EventRecorder.py).
+The cogs run against the fakes in ``benchmarks/fakes.py``; every REST call
+they make is counted rather than sent. Run from the repository root:
+
+    python -m benchmarks.replay events.jsonl.gz              # real time
+    python -m benchmarks.replay events.jsonl.gz --speed 10   # 10x faster
+    python -m benchmarks.replay events.jsonl.gz --speed max  # as fast as possible
+    python -m benchmarks.replay events.jsonl.gz --rest-latency 0.08 --json out.json
+
+Reported: events/s, end-to-end event latency percentiles (dispatch until
+every listener for the event has finished), per-cog listener latency and
+errors, and REST calls per cog and per endpoint.
+"""
+import argparse
+import asyncio
+import gzip
+import importlib
+import json
+import statistics
+import sys
+import time
+import types
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+from unittest import mock
+
+from PMPAdmin.Metrics import METRICS, instrument_cog
+
+from .fakes import (
+    FakeAttachment,
+    FakeBot,
+    FakeEmoji,
+    FakeForumChannel,
+    FakeGuild,
+    FakeMember,
+    FakeMessage,
+    FakeReactionPayload,
+    FakeRole,
+    FakeTextChannel,
+    FakeThread,
+    FakeUser,
+    days_ago,
+    fake_config,
+)
+from .run import data_dir
+
+REPLAYED_COGS = ("PMPAdmin", "TalkModerator", "ChallengeScraper", "YoutubePlaylistListener", "RoleAssignment")
+
+EVENT_NAMES = {
+    "message": "on_message",
+    "message_edit": "on_message_edit",
+    "reaction_add": "on_raw_reaction_add",
+    "reaction_remove": "on_raw_reaction_remove",
+    "member_join": "on_member_join",
+    "member_update": "on_member_update",
+    "thread_create": "on_thread_create",
+}
+
+
+def read_recording(path: str) -> Tuple[dict, List[dict]]:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    header = next((r for r in records if r.get("type") == "header"), {})
+    events = sorted((r for r in records if r.get("type") in EVENT_NAMES), key=lambda r: r["t"])
+    return header, events
+
+
+class World:
+    """Builds fake guilds, channels, roles and members on demand from recorded IDs."""
+
+    def __init__(self, bot: FakeBot, header: dict):
+        self.bot = bot
+        self.forums = {
+            cid for guilds in header.get("routes", {}).get("ChallengeScraper", {}).values() for cid in guilds
+        }
+        self.messages: Dict[int, FakeMessage] = {}
+
+    def guild(self, guild_id: int) -> FakeGuild:
+        return self.bot.get_guild(guild_id) or self.bot.add_guild(f"guild-{guild_id}", guild_id)
+
+    def role(self, guild: FakeGuild, role_id: int):
+        role = guild.get_role(role_id)
+        if role is None:
+            role = FakeRole(guild, f"role-{role_id}", role_id)
+            guild.roles.append(role)
+        return role
+
+    def channel(self, guild: FakeGuild, data: dict):
+        channel = guild.get_channel(data["id"])
+        if channel is not None:
+            return channel
+        if data.get("parent"):
+            parent = guild.get_channel(data["parent"]) or self._parent(guild, data["parent"])
+            if isinstance(parent, FakeForumChannel):
+                return parent.create_day_thread(data.get("name", "thread"), data["id"])
+            thread = FakeThread(parent, data.get("name", "thread"), data["id"])
+            return guild.add_channel(thread)
+        return guild.add_channel(FakeTextChannel(guild, f"channel-{data['id']}", data["id"]))
+
+    def _parent(self, guild: FakeGuild, channel_id: int):
+        cls = FakeForumChannel if channel_id in self.forums else FakeTextChannel
+        return guild.add_channel(cls(guild, f"channel-{channel_id}", channel_id))
+
+    def member(self, guild: FakeGuild, data: dict, cached: bool = True) -> FakeMember:
+        member = guild.get_member(data["id"]) or guild._uncached.get(data["id"])
+        if member is None:
+            member = FakeMember(guild, f"user-{data['id']}", user_id=data["id"], bot=data.get("bot", False),
+                                joined_at=days_ago(data.get("joined_days", 30)))
+            guild.add_member(member, cached=cached)
+        if "roles" in data:
+            member.roles = [guild.default_role, *(self.role(guild, rid) for rid in data["roles"])]
+        return member
+
+    def message(self, data: dict) -> FakeMessage:
+        guild = self.guild(data["guild"])
+        channel = self.channel(guild, data["channel"])
+        author_data = data["author"]
+        member = self.member(guild, author_data, cached=author_data.get("member", True))
+        author = member if author_data.get("member", True) else FakeUser(member.name, user_id=member.id, bot=member.bot)
+        message = FakeMessage(
+            channel, author, data.get("content", ""),
+            [FakeAttachment(f"file{ext}", ctype) for ext, ctype in data.get("attachments", [])],
+            [object()] * data.get("stickers", 0),
+            message_id=data["id"],
+        )
+        channel.messages.append(message)
+        self.messages[message.id] = message
+        return message
+
+    def event_args(self, record: dict) -> tuple:
+        kind = record["type"]
+        if kind == "message":
+            return (self.message(record["message"]),)
+        if kind == "message_edit":
+            before = self.messages.get(record["message"]["id"])
+            after = self.message(record["message"])
+            if before is not None:
+                after.channel.messages.remove(before)
+            return (before or after, after)
+        if kind in ("reaction_add", "reaction_remove"):
+            guild = self.guild(record["guild"])
+            member = self.member(guild, {"id": record["user"], "bot": bool(record.get("bot"))})
+            emoji_id, emoji_name = record["emoji"]
+            payload = FakeReactionPayload(
+                guild, record["message"], member.id, FakeEmoji(emoji_name, emoji_id),
+                member=member if kind == "reaction_add" else None,
+                event_type="REACTION_ADD" if kind == "reaction_add" else "REACTION_REMOVE",
+            )
+            payload.channel_id = record["channel"]
+            return (payload,)
+        if kind == "member_join":
+            guild = self.guild(record["guild"])
+            return (self.member(guild, record["member"]),)
+        if kind == "member_update":
+            guild = self.guild(record["guild"])
+            before = FakeMember(guild, f"user-{record['before']['id']}", user_id=record["before"]["id"],
+                                roles=[self.role(guild, rid) for rid in record["before"]["roles"]])
+            return (before, self.member(guild, record["member"]))
+        if kind == "thread_create":
+            guild = self.guild(record["guild"])
+            return (self.channel(guild, record["channel"]),)
+        raise ValueError(kind)
+
+
+async def load_cogs(bot: FakeBot, world: World, header: dict) -> Dict[str, object]:
+    cogs = {}
+    routes = header.get("routes", {})
+    with fake_config():
+        for name in REPLAYED_COGS:
+            module = importlib.import_module(f"PMPAdmin.{name}")
+            cogs[name] = getattr(module, name)(bot)
+
+    # seed each cog's config from the recorded routes, then load it as Red would
+    settings = {
+        "TalkModerator": "channel_id",
+        "YoutubePlaylistListener": "channel_id",
+        "ChallengeScraper": "forum_channel_id",
+    }
+    for name, key in settings.items():
+        for gid, channel_ids in routes.get(name, {}).items():
+            if channel_ids:
+                await getattr(cogs[name].config.guild_from_id(int(gid)), key).set(channel_ids[0])
+
+    for name, cog in cogs.items():
+        instrument_cog(cog)
+        if name != "RoleAssignment" and hasattr(cog, "cog_load"):
+            await cog.cog_load()
+        bot.add_cog_listeners(cog)
+
+    # RoleAssignment keeps its mappings in SQLite; load them straight into its caches
+    roles = cogs["RoleAssignment"]
+    for gid, messages in header.get("reaction_roles", {}).items():
+        guild = world.guild(int(gid))
+        for mid, mapping in messages.items():
+            for role_id in mapping.values():
+                if str(role_id).isdigit():
+                    world.role(guild, int(role_id))
+            roles.emoji_map.setdefault(gid, {})[mid] = dict(mapping)
+            roles._cache_track(gid, mid, "recorded")
+    return cogs
+
+
+async def unload_cogs(cogs: Dict[str, object]):
+    roles = cogs["RoleAssignment"]
+    # let coalesced role edits land so their REST calls are counted
+    while roles._role_flushers:
+        await asyncio.gather(*list(roles._role_flushers.values()), return_exceptions=True)
+    roles.db._executor.shutdown(wait=False)
+    for name, cog in cogs.items():
+        if name == "RoleAssignment":
+            continue
+        result = cog.cog_unload()
+        if asyncio.iscoroutine(result):
+            await result
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(len(ordered) * q))]  # noqa: E731
+    return {
+        "count": len(ordered),
+        "p50_ms": pick(0.50) * 1000,
+        "p95_ms": pick(0.95) * 1000,
+        "p99_ms": pick(0.99) * 1000,
+        "max_ms": ordered[-1] * 1000,
+        "mean_ms": statistics.fmean(ordered) * 1000,
+    }
+
+
+async def replay(path: str, speed: Optional[float], rest_latency: float) -> dict:
+    header, events = read_recording(path)
+    bot = FakeBot(rest_latency)
+    world = World(bot, header)
+    METRICS.counters.clear()
+    METRICS.histograms.clear()
+    METRICS.gauges.clear()
+
+    talk = importlib.import_module("PMPAdmin.TalkModerator")
+
+    async def no_sleep(_):
+        return None
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    listener_tasks: List[asyncio.Task] = []
+
+    async def track(kind: str, tasks: List[asyncio.Task], dispatched: float):
+        await asyncio.gather(*tasks, return_exceptions=True)
+        latencies[kind].append(time.perf_counter() - dispatched)
+
+    with data_dir():
+        cogs = await load_cogs(bot, world, header)
+        bot.rest.reset()
+        # TalkModerator keeps its reminder up for 20s; don't hold the replay open for it
+        with mock.patch.object(talk, "asyncio", types.SimpleNamespace(sleep=no_sleep)):
+            started = time.perf_counter()
+            for record in events:
+                if speed:
+                    delay = started + record["t"] / speed - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                args = world.event_args(record)
+                dispatched = time.perf_counter()
+                tasks = bot.dispatch(EVENT_NAMES[record["type"]], *args)
+                listener_tasks.append(asyncio.create_task(track(record["type"], tasks, dispatched)))
+                if not speed:
+                    # still yield so listeners interleave with dispatch, as on the gateway
+                    await asyncio.sleep(0)
+            await asyncio.gather(*listener_tasks)
+            elapsed = time.perf_counter() - started
+            await unload_cogs(cogs)
+
+    by_cog = {}
+    for (name, labels), hist in METRICS.histograms.items():
+        if name != "pmpadmin_listener_seconds" or not hist.count:
+            continue
+        cog = dict(labels)["cog"]
+        entry = by_cog.setdefault(cog, {"calls": 0, "errors": 0, "p95_bucket_ms": 0.0})
+        entry["calls"] += hist.count
+        entry["p95_bucket_ms"] = max(entry["p95_bucket_ms"], hist.quantile(0.95) * 1000)
+    for (name, labels), counter in METRICS.counters.items():
+        if name == "pmpadmin_listener_errors_total" and counter.value:
+            by_cog.setdefault(dict(labels)["cog"], {"calls": 0, "errors": 0, "p95_bucket_ms": 0.0})["errors"] += counter.value
+    for cog, calls in bot.rest.by_cog.items():
+        by_cog.setdefault(cog, {"calls": 0, "errors": 0, "p95_bucket_ms": 0.0})["rest_calls"] = calls
+
+    all_latencies = [s for samples in latencies.values() for s in samples]
+    return {
+        "recording": path,
+        "speed": speed or "max",
+        "rest_latency_s": rest_latency,
+        "events": len(events),
+        "recorded_span_s": events[-1]["t"] if events else 0,
+        "wall_s": elapsed,
+        "events_per_s": len(events) / elapsed if elapsed else 0,
+        "latency": percentiles(all_latencies),
+        "latency_by_event": {kind: percentiles(samples) for kind, samples in latencies.items()},
+        "cogs": by_cog,
+        "rest_calls": dict(Counter(bot.rest.calls).most_common()),
+    }
+
+
+def print_report(result: dict):
+    print(f"Replayed {result['events']} events ({result['recorded_span_s']:.0f}s recorded) "
+          f"at speed {result['speed']} in {result['wall_s']:.2f}s: {result['events_per_s']:.1f} events/s")
+    lat = result["latency"]
+    if lat:
+        print(f"Event latency p50/p95/p99/max: {lat['p50_ms']:.1f} / {lat['p95_ms']:.1f} / "
+              f"{lat['p99_ms']:.1f} / {lat['max_ms']:.1f} ms")
+    print(f"\n{'event':<18} {'count':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for kind, p in sorted(result["latency_by_event"].items()):
+        print(f"{kind:<18} {p['count']:>7} {p['p50_ms']:>8.1f} {p['p95_ms']:>8.1f} {p['p99_ms']:>8.1f}")
+    print(f"\n{'cog':<26} {'listener calls':>14} {'errors':>7} {'p95 (bucket)':>13} {'REST calls':>11}")
+    for cog, c in sorted(result["cogs"].items()):
+        print(f"{cog:<26} {c['calls']:>14} {c['errors']:>7} {c['p95_bucket_ms']:>11.0f}ms {c.get('rest_calls', 0):>11}")
+    print("\nREST calls by endpoint:")
+    for endpoint, calls in result["rest_calls"].items():
+        print(f"  {endpoint:<28} {calls}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recording")
+    parser.add_argument("--speed", default="1", help="replay speed multiplier, or 'max'")
+    parser.add_argument("--rest-latency", type=float, default=0.05, help="seconds each fake REST call takes")
+    parser.add_argument("--json", dest="json_path", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    speed = None if args.speed == "max" else float(args.speed)
+    result = asyncio.run(replay(args.recording, speed, args.rest_latency))
+    print_report(result)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,422 @@
+"""Offline benchmarks for the PMPAdmin hot paths.
+
+Run from the repository root, in an environment with the bot's requirements
+installed (discord.py and Red):
+
+    python -m benchmarks.run                # realistic and 10x sizes
+    python -m benchmarks.run -k reaction    # only benchmarks whose name matches
+    python -m benchmarks.run --no-save      # don't append to the results file
+
+Each run is appended to ``benchmarks/results.jsonl`` together with the git
+commit it ran on, and compared with the previous run so regressions show up
+from one commit to the next.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import types
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+from unittest import mock
+
+from .fakes import (
+    FakeAttachment,
+    FakeBot,
+    FakeEmoji,
+    FakeForumChannel,
+    FakeMember,
+    FakeMessage,
+    FakeReactionPayload,
+    FakeTextChannel,
+    FakeUser,
+    days_ago,
+    fake_config,
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_PATH = os.path.join(ROOT, "benchmarks", "results.jsonl")
+# Median slowdown (relative to the previous run) reported as a regression
+REGRESSION_THRESHOLD = 0.20
+
+SCALES = {"realistic": 1, "10x": 10}
+
+BENCHMARKS: Dict[str, Callable[[int], Awaitable[dict]]] = {}
+
+
+def cog_module(name: str) -> types.ModuleType:
+    # PMPAdmin/__init__.py rebinds PMPAdmin.<Cog> to the class, so fetch the module itself
+    return importlib.import_module(f"PMPAdmin.{name}")
+
+
+def benchmark(name: str):
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+async def measure(op: Callable[[], Awaitable], iterations: int, warmup: int = 3) -> dict:
+    """Await *op* *iterations* times and summarise per-call latency in microseconds."""
+    for _ in range(warmup):
+        await op()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await op()
+        samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    return {
+        "iterations": iterations,
+        "median_us": statistics.median(samples),
+        "p95_us": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "mean_us": statistics.fmean(samples),
+    }
+
+
+@contextmanager
+def data_dir():
+    """Run inside a throwaway working directory so cogs' data/ files go there."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="pmpadmin-bench-") as tmp:
+        os.chdir(tmp)
+        try:
+            yield tmp
+        finally:
+            os.chdir(cwd)
+
+
+def make_guild(bot: FakeBot, members: int, uncached_share: float = 0.0):
+    guild = bot.add_guild("Portland Music Producers")
+    member_role = guild.add_role("Member")
+    unverified = guild.add_role("Unverified")
+    rng = random.Random(members)
+    for i in range(members):
+        roles = [unverified] if rng.random() < 0.05 else [member_role]
+        member = FakeMember(guild, f"member{i}", roles=roles, joined_at=days_ago(rng.uniform(0, 400)))
+        guild.add_member(member, cached=rng.random() >= uncached_share)
+    return guild, member_role, unverified
+
+
+# ----------------------------------------------------------------------
+# TalkModerator
+# ----------------------------------------------------------------------
+@benchmark("talkmoderator.enforce_audio_only")
+async def bench_enforce_audio_only(scale: int) -> dict:
+    module = cog_module("TalkModerator")
+
+    bot = FakeBot()
+    guild, _, _ = make_guild(bot, 200 * scale)
+    sketchpad = guild.add_channel(FakeTextChannel(guild, "sketchpad"))
+    general = guild.add_channel(FakeTextChannel(guild, "general"))
+    with fake_config():
+        cog = module.TalkModerator(bot)
+    await cog.config.guild(guild).channel_id.set(sketchpad.id)
+    cog._set_channel(guild.id, sketchpad.id)
+
+    rng = random.Random(1)
+    authors = guild.members[:50 * scale]
+    messages = []
+    for i in range(500 * scale):
+        roll = rng.random()
+        if roll < 0.8:
+            messages.append(FakeMessage(general, rng.choice(authors), "chatting"))
+        elif roll < 0.95:
+            messages.append(FakeMessage(sketchpad, rng.choice(authors), "", [FakeAttachment("idea.wav", "audio/wav")]))
+        else:
+            messages.append(FakeMessage(sketchpad, rng.choice(authors), "check this out"))
+    feed = iter(messages * 2)
+
+    # the reminder is deleted after a 20s sleep; skip the wait offline
+    async def no_sleep(_):
+        return None
+
+    with mock.patch.object(module, "asyncio", types.SimpleNamespace(sleep=no_sleep)):
+        result = await measure(lambda: cog._enforce_audio_only(next(feed)), len(messages))
+    result["rest_calls"] = bot.rest.reset()
+    return result
+
+
+# ----------------------------------------------------------------------
+# ChallengeScraper
+# ----------------------------------------------------------------------
+def make_day_thread(bot: FakeBot, guild, messages: int, authors: int):
+    forum = guild.add_channel(FakeForumChannel(guild, "challenges"))
+    thread = forum.create_day_thread("DAY 7")
+    rng = random.Random(messages)
+    posters = rng.sample(guild.members + list(guild._uncached.values()), authors)
+    for i in range(messages):
+        author = rng.choice(posters)
+        # history() only yields a Member when the author is in the member cache
+        if guild.get_member(author.id) is None:
+            author = FakeUser(author.name, user_id=author.id)
+        roll = rng.random()
+        if roll < 0.4:
+            content, attachments = f"day 7 done https://soundcloud.com/u{author.id}/t{i}", []
+        elif roll < 0.6:
+            content, attachments = "", [FakeAttachment(f"take{i}.mp3", "audio/mpeg")]
+        elif roll < 0.7:
+            content, attachments = f"lol https://tenor.com/view/{i} https://i.imgur.com/{i}.png", []
+        else:
+            content, attachments = "nice one!", []
+        thread.messages.append(FakeMessage(thread, author, content, attachments))
+    return thread
+
+
+@benchmark("challengescraper.collect_urls")
+async def bench_collect_urls(scale: int) -> dict:
+    module = cog_module("ChallengeScraper")
+
+    bot = FakeBot()
+    guild, _, _ = make_guild(bot, 300 * scale, uncached_share=0.3)
+    thread = make_day_thread(bot, guild, 150 * scale, 40 * scale)
+    with fake_config():
+        cog = module.ChallengeScraper(bot)
+    result = await measure(lambda: cog._collect_urls(thread), 20, warmup=1)
+    result["rest_calls"] = bot.rest.reset()
+    return result
+
+
+@benchmark("challengescraper.format_and_split")
+async def bench_format_and_split(scale: int) -> dict:
+    module = cog_module("ChallengeScraper")
+
+    bot = FakeBot()
+    guild, _, _ = make_guild(bot, 300 * scale)
+    thread = make_day_thread(bot, guild, 150 * scale, 40 * scale)
+    with fake_config():
+        cog = module.ChallengeScraper(bot)
+    records = await cog._collect_urls(thread)
+    bot.rest.reset()
+
+    async def op():
+        module._split_chunks(module.ChallengeScraper._format(records, thread.name))
+
+    return await measure(op, 200)
+
+
+# ----------------------------------------------------------------------
+# YoutubePlaylistListener
+# ----------------------------------------------------------------------
+@benchmark("youtube.process_message")
+async def bench_process_message(scale: int) -> dict:
+    module = cog_module("YoutubePlaylistListener")
+
+    bot = FakeBot()
+    guild, _, _ = make_guild(bot, 200 * scale)
+    channel = guild.add_channel(FakeTextChannel(guild, "what-you-listening-to"))
+    rng = random.Random(2)
+    messages = []
+    for i in range(400 * scale):
+        roll = rng.random()
+        if roll < 0.5:
+            content = f"this slaps https://youtu.be/{i:011d}"
+        elif roll < 0.7:
+            content = f"again https://www.youtube.com/watch?v={rng.randrange(max(i, 1)):011d}"
+        elif roll < 0.8:
+            content = f"https://open.spotify.com/track/{i:022d}"
+        else:
+            content = "no links here"
+        messages.append(FakeMessage(channel, rng.choice(guild.members), content))
+
+    with data_dir():
+        with fake_config():
+            cog = module.YoutubePlaylistListener(bot)
+        try:
+            await cog.config.guild(guild).channel_id.set(channel.id)
+            feed = iter(messages)
+            result = await measure(lambda: cog._process_message(next(feed)), len(messages) - 3)
+        finally:
+            await cog.cog_unload()
+    result["queued_jobs"] = len(cog._queue.jobs)
+    return result
+
+
+# ----------------------------------------------------------------------
+# RoleAssignment
+# ----------------------------------------------------------------------
+async def make_role_cog(bot: FakeBot, guild, messages: int, emojis_per_message: int):
+    module = cog_module("RoleAssignment")
+    # the DB is never opened; only the in-memory caches are exercised
+    cog = module.RoleAssignment(bot)
+    gid = str(guild.id)
+    keys = []
+    for m in range(messages):
+        mid = str(1_400_000_000_000_000_000 + m)
+        mapping = cog.emoji_map.setdefault(gid, {}).setdefault(mid, {})
+        for e in range(emojis_per_message):
+            role = guild.add_role(f"genre-{m}-{e}")
+            emoji = FakeEmoji(f"e{m}_{e}", snowflake_for(m, e)) if e % 2 else FakeEmoji(chr(0x1F3B5 + e))
+            mapping[str(emoji)] = str(role.id)
+            keys.append((int(mid), emoji))
+        cog._cache_track(gid, mid, f"category-{m}")
+    return cog, keys
+
+
+def snowflake_for(m: int, e: int) -> int:
+    return 1_300_000_000_000_000_000 + m * 1000 + e
+
+
+@benchmark("roleassignment.reaction_add")
+async def bench_reaction_add(scale: int) -> dict:
+    bot = FakeBot()
+    guild, _, _ = make_guild(bot, 500 * scale)
+    cog, keys = await make_role_cog(bot, guild, 6 * scale, 20)
+    rng = random.Random(3)
+    payloads = []
+    for _ in range(1000 * scale):
+        member = rng.choice(guild.members)
+        if rng.random() < 0.7:
+            mid, emoji = rng.choice(keys)
+        else:
+            # reactions on untracked messages are the common case
+            mid, emoji = rng.randrange(10 ** 18), FakeEmoji("👍")
+        payloads.append(FakeReactionPayload(guild, mid, member.id, emoji, member=member))
+    feed = iter(payloads)
+    try:
+        result = await measure(lambda: cog.on_raw_reaction_add(next(feed)), len(payloads) - 3)
+        result["member_edits"] = await drain_role_changes(cog, bot)
+    finally:
+        cog.db._executor.shutdown(wait=False)
+    return result
+
+
+@benchmark("roleassignment.reaction_remove")
+async def bench_reaction_remove(scale: int) -> dict:
+    bot = FakeBot()
+    guild, _, _ = make_guild(bot, 500 * scale, uncached_share=0.02)
+    cog, keys = await make_role_cog(bot, guild, 6 * scale, 20)
+    rng = random.Random(4)
+    users = guild.members + list(guild._uncached.values())
+    payloads = []
+    for _ in range(1000 * scale):
+        mid, emoji = rng.choice(keys)
+        # remove events carry no member; some reactors are missing from the cache
+        payloads.append(FakeReactionPayload(guild, mid, rng.choice(users).id, emoji, event_type="REACTION_REMOVE"))
+    feed = iter(payloads)
+    try:
+        result = await measure(lambda: cog.on_raw_reaction_remove(next(feed)), len(payloads) - 3)
+        result["member_edits"] = await drain_role_changes(cog, bot)
+    finally:
+        cog.db._executor.shutdown(wait=False)
+    return result
+
+
+async def drain_role_changes(cog, bot: FakeBot) -> int:
+    """Apply the coalesced role changes now and return how many member edits they took."""
+    pending, cog._role_changes = cog._role_changes, {}
+    for task in cog._role_flushers.values():
+        task.cancel()
+    cog._role_flushers.clear()
+    bot.rest.reset()
+    for key, changes in pending.items():
+        await cog._apply_role_changes(key, changes)
+    return bot.rest.reset().get("member.edit", 0)
+
+
+# ----------------------------------------------------------------------
+# PMPAdmin
+# ----------------------------------------------------------------------
+@benchmark("pmpadmin.get_unverified_members")
+async def bench_get_unverified_members(scale: int) -> dict:
+    module = cog_module("PMPAdmin")
+
+    bot = FakeBot()
+    guild, _, unverified = make_guild(bot, 1500 * scale)
+    # the cog compares against its hard-coded role ID
+    unverified.id = module.ROLE_ID_UNVERIFIED
+
+    async def op():
+        module.getUnverifiedMembers(guild)
+
+    return await measure(op, 50)
+
+
+# ----------------------------------------------------------------------
+# Runner
+# ----------------------------------------------------------------------
+def git_commit() -> Optional[str]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--", "PMPAdmin"], cwd=ROOT, capture_output=True, text=True).stdout
+        return commit + ("-dirty" if dirty.strip() else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_previous() -> Optional[dict]:
+    if not os.path.exists(RESULTS_PATH):
+        return None
+    with open(RESULTS_PATH, encoding="utf-8") as f:
+        lines = [line for line in f if line.strip()]
+    return json.loads(lines[-1]) if lines else None
+
+
+def report(results: Dict[str, dict], previous: Optional[dict]) -> List[str]:
+    regressions = []
+    before = (previous or {}).get("results", {})
+    print(f"{'benchmark':<46} {'median':>10} {'p95':>10} {'change':>8}  extra")
+    for name, r in results.items():
+        change = ""
+        old = before.get(name)
+        if old:
+            delta = r["median_us"] / old["median_us"] - 1 if old["median_us"] else 0.0
+            change = f"{delta:+.0%}"
+            if delta > REGRESSION_THRESHOLD:
+                regressions.append(f"{name}: {old['median_us']:.1f}us -> {r['median_us']:.1f}us ({change})")
+        extra = {k: v for k, v in r.items() if k not in ("iterations", "median_us", "p95_us", "mean_us")}
+        print(f"{name:<46} {r['median_us']:>8.1f}us {r['p95_us']:>8.1f}us {change:>8}  {json.dumps(extra) if extra else ''}")
+    return regressions
+
+
+async def run(selected: List[str]) -> Dict[str, dict]:
+    results = {}
+    for name in selected:
+        for label, scale in SCALES.items():
+            results[f"{name}[{label}]"] = await BENCHMARKS[name](scale)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", dest="match", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--no-save", action="store_true", help="don't append this run to the results file")
+    args = parser.parse_args(argv)
+
+    selected = [name for name in BENCHMARKS if args.match in name]
+    if not selected:
+        parser.error(f"no benchmark matches {args.match!r}")
+    previous = load_previous()
+    results = asyncio.run(run(selected))
+    regressions = report(results, previous)
+
+    if not args.no_save:
+        entry = {
+            "commit": git_commit(),
+            "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "results": results,
+        }
+        with open(RESULTS_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+    if regressions:
+        print(f"\nRegressions over {REGRESSION_THRESHOLD:.0%} against {previous.get('commit')}:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())